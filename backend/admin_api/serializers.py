@@ -6,6 +6,7 @@ from projects.models import (
     ProjectType, Project, Question, Answer, 
     AI_Question, AI_Answer, Project_Report
 )
+from projects.utils.reports import regeneration_pending
 from .models import Settings
 
 User = get_user_model()
@@ -25,6 +26,10 @@ class AdminUserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined', 'last_login', 'created_at', 'updated_at']
     
     def get_project_count(self, obj):
+        # Annotated by the admin views; instances from elsewhere fall back to a query
+        project_count = getattr(obj, 'project_count', None)
+        if project_count is not None:
+            return project_count
         return Project.objects.filter(user=obj).count()
 
 
@@ -108,9 +113,15 @@ class AdminProjectTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_question_count(self, obj):
+        question_count = getattr(obj, 'question_count', None)
+        if question_count is not None:
+            return question_count
         return Question.objects.filter(project_type=obj).count()
     
     def get_project_count(self, obj):
+        project_count = getattr(obj, 'project_count', None)
+        if project_count is not None:
+            return project_count
         return Project.objects.filter(project_type=obj).count()
 
 
@@ -136,6 +147,9 @@ class AdminProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_has_report(self, obj):
+        has_report = getattr(obj, 'has_report', None)
+        if has_report is not None:
+            return has_report
         return Project_Report.objects.filter(project=obj).exists()
 
 
@@ -171,12 +185,16 @@ class AdminAIQuestionSerializer(serializers.ModelSerializer):
         ]
     
     def get_answer_count(self, obj):
+        answer_count = getattr(obj, 'answer_count', None)
+        if answer_count is not None:
+            return answer_count
         return AI_Answer.objects.filter(ai_question=obj).count()
     
     def get_status(self, obj):
-        if AI_Answer.objects.filter(ai_question=obj).exists():
-            return 'answered'
-        return 'pending'
+        is_answered = getattr(obj, 'is_answered', None)
+        if is_answered is None:
+            is_answered = AI_Answer.objects.filter(ai_question=obj).exists()
+        return 'answered' if is_answered else 'pending'
 
 
 class NestedProjectSerializer(serializers.ModelSerializer):
@@ -193,19 +211,37 @@ class AdminReportSerializer(serializers.ModelSerializer):
     project = NestedProjectSerializer(read_only=True)
     format = serializers.SerializerMethodField()
     status = serializers.SerializerMethodField()
+    regeneration_pending = serializers.SerializerMethodField()
     
     class Meta:
         model = Project_Report
         fields = [
             'id', 'project', 'report', 'created_at', 'updated_at',
-            'format', 'status'
+            'format', 'status', 'regeneration_pending'
         ]
     
     def get_format(self, obj):
         return 'PDF'  # Default format
     
     def get_status(self, obj):
-        return 'ready' if obj.report else 'pending'
+        # size mirrors the report, so lists that defer the report column don't load it
+        return 'ready' if obj.size else 'pending'
+
+    def get_regeneration_pending(self, obj):
+        regeneration_pending = getattr(obj, 'regeneration_pending', None)
+        if regeneration_pending is not None:
+            return regeneration_pending
+        return regeneration_pending(obj.project_id)
+
+
+class AdminReportListSerializer(AdminReportSerializer):
+    """Report metadata with a short preview instead of the full HTML."""
+
+    class Meta(AdminReportSerializer.Meta):
+        fields = [
+            'id', 'project', 'preview', 'size', 'created_at', 'updated_at',
+            'format', 'status', 'regeneration_pending'
+        ]
 
 
 class SettingsSerializer(serializers.ModelSerializer):
@@ -1,3 +1,193 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from projects.models import (
+    ProjectType, Project, Question, AI_Question, AI_Answer,
+    Project_Report, Report_Job
+)
+from users.models import User
+
+
+class AdminAPITestCase(TestCase):
+    """Signs an API client in as an admin."""
+
+    def setUp(self):
+        self.admin = User.objects.create(username='admin', email='admin@example.com', role='admin')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.admin).key)
+
+
+class AdminListQueryCountTests(AdminAPITestCase):
+    """The admin list endpoints take the same number of queries for 1 row as for many."""
+
+    def setUp(self):
+        super().setUp()
+        self.rows = 0
+
+    def add_rows(self, count):
+        """Adds `count` clients, each with a project, question, answered AI question and report."""
+        for _ in range(count):
+            self.rows += 1
+            user = User.objects.create(username=f'client{self.rows}', email=f'client{self.rows}@example.com', role='client')
+            project_type = ProjectType.objects.create(name=f'Type {self.rows}')
+            Question.objects.create(project_type=project_type, text='What are you building?', question_no=1)
+            project = Project.objects.create(name=f'Project {self.rows}', user=user, project_type=project_type)
+            ai_question = AI_Question.objects.create(project=project, text='Who are the users?', question_no=1)
+            AI_Answer.objects.create(ai_question=ai_question, user=user, text='Staff')
+            Project_Report.objects.create(project=project, report='<p>Report</p>')
+            Report_Job.objects.create(project=project, kind='regenerate')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.data
+
+    def assertConstantQueries(self, url_name):
+        url = reverse(url_name)
+        self.add_rows(1)
+        few_queries, _ = self.count_queries(url)
+        self.add_rows(4)
+        many_queries, data = self.count_queries(url)
+        self.assertGreaterEqual(len(data['results']), 5)
+        self.assertEqual(few_queries, many_queries)
+        return data['results']
+
+    def test_users(self):
+        results = self.assertConstantQueries('admin-users')
+        counts = {row['username']: row['project_count'] for row in results}
+        self.assertEqual(counts['client1'], 1)
+        self.assertEqual(counts['admin'], 0)
+
+    def test_project_types(self):
+        results = self.assertConstantQueries('admin-project-types')
+        self.assertTrue(all(row['question_count'] == 1 and row['project_count'] == 1 for row in results))
+
+    def test_projects(self):
+        results = self.assertConstantQueries('admin-projects')
+        self.assertTrue(all(row['has_report'] for row in results))
+
+    def test_questions(self):
+        self.assertConstantQueries('admin-questions')
+
+    def test_ai_questions(self):
+        results = self.assertConstantQueries('admin-ai-questions')
+        self.assertTrue(all(row['answer_count'] == 1 and row['status'] == 'answered' for row in results))
+
+    def test_reports(self):
+        results = self.assertConstantQueries('admin-reports')
+        self.assertTrue(all(row['regeneration_pending'] for row in results))
+
+    def test_filters_use_annotations(self):
+        self.add_rows(2)
+        Project_Report.objects.filter(project__name='Project 1').delete()
+        AI_Answer.objects.filter(ai_question__project__name='Project 1').delete()
+
+        response = self.client.get(reverse('admin-projects'), {'has_report': 'false'})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Project 1'])
+        response = self.client.get(reverse('admin-ai-questions'), {'answered': 'false'})
+        self.assertEqual([row['status'] for row in response.data['results']], ['pending'])
+        self.assertEqual(response.data['results'][0]['answer_count'], 0)
+
+
+class AdminListPaginationTests(AdminAPITestCase):
+    """The admin list endpoints page through rows with cursors."""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username='client', email='client@example.com', role='client')
+        project_type = ProjectType.objects.create(name='Web')
+        self.projects = [
+            Project.objects.create(name=f'Project {number}', user=user, project_type=project_type)
+            for number in range(7)
+        ]
+
+    def test_pages_follow_cursor(self):
+        names = []
+        cursor = None
+        while True:
+            params = {'page_size': 3}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get(reverse('admin-projects'), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 3)
+            self.assertIsNone(response.data['count'])
+            names.extend(row['name'] for row in response.data['results'])
+            cursor = response.data['next']
+            if not cursor:
+                break
+        # Newest first; rows created in the same instant are ordered by id
+        expected = sorted(self.projects, key=lambda project: (-project.created_at.timestamp(), project.id))
+        self.assertEqual(names, [project.name for project in expected])
+
+    def test_deep_page_filters_instead_of_offsetting(self):
+        first = self.client.get(reverse('admin-projects'), {'page_size': 2})
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('admin-projects'), {'page_size': 2, 'cursor': first.data['next']})
+        page_query = context.captured_queries[-1]['sql']
+        self.assertNotIn('OFFSET', page_query.upper())
+
+    def test_count_is_optional(self):
+        response = self.client.get(reverse('admin-projects'), {'count': 'exact', 'page_size': 2})
+        self.assertEqual(response.data['count'], 7)
+        response = self.client.get(reverse('admin-projects'), {'count': 'approximate'})
+        self.assertEqual(response.data['count'], 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('admin-projects'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_report_status_filters_before_paging(self):
+        for project in self.projects:
+            Project_Report.objects.create(project=project, report='<p>Report</p>' if project.id % 2 else '')
+        response = self.client.get(reverse('admin-reports'), {'status': 'pending', 'page_size': 2, 'count': 'exact'})
+        pending = [project for project in self.projects if not project.id % 2]
+        self.assertEqual(response.data['count'], len(pending))
+        self.assertEqual(len(response.data['results']), min(2, len(pending)))
+        self.assertTrue(all(row['status'] == 'pending' for row in response.data['results']))
+
+
+class AdminQuestionReorderTests(AdminAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project_type = ProjectType.objects.create(name='Web')
+        self.questions = [
+            Question.objects.create(project_type=self.project_type, text=f'Question {number}', question_no=number)
+            for number in range(1, 5)
+        ]
+
+    def reorder(self, question_order):
+        return self.client.post(reverse('admin-questions-reorder'), {
+            'project_type_id': self.project_type.id,
+            'question_order': question_order
+        }, format='json')
+
+    def test_renumbers_and_relinks(self):
+        first, second, third, fourth = self.questions
+        with CaptureQueriesContext(connection) as context:
+            response = self.reorder([fourth.id, second.id, first.id])
+        self.assertEqual(response.status_code, 200)
+        # Left out questions keep their order after the listed ones
+        self.assertEqual([row['id'] for row in response.data['results']], [fourth.id, second.id, first.id, third.id])
+        chain = dict(Question.objects.values_list('id', 'next_question_id'))
+        self.assertEqual(chain, {fourth.id: second.id, second.id: first.id, first.id: third.id, third.id: None})
+        updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "projects_question"')]
+        self.assertEqual(len(updates), 2)
+
+    def test_touches_updated_at(self):
+        before = {question.id: question.updated_at for question in self.questions}
+        self.reorder([question.id for question in reversed(self.questions)])
+        for question_id, updated_at in Question.objects.values_list('id', 'updated_at'):
+            self.assertGreater(updated_at, before[question_id])
+
+    def test_rejects_other_questions(self):
+        other = Question.objects.create(project_type=ProjectType.objects.create(name='App'), text='Other', question_no=1)
+        response = self.reorder([other.id, self.questions[0].id])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(Question.objects.filter(project_type=self.project_type).order_by('question_no').values_list('id', flat=True)), [question.id for question in self.questions])
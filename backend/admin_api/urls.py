@@ -7,7 +7,8 @@ from .views import (
     AdminProjectsView, AdminProjectDetailView,
     AdminQuestionsView, AdminQuestionDetailView, AdminQuestionToggleView, AdminQuestionReorderView,
     AdminAIQuestionsView,
-    AdminReportsView, AdminReportDetailView, AdminReportRegenerateView,
+    AdminReportsView, AdminReportDetailView, AdminReportDownloadView, AdminReportRegenerateView,
+    AdminLLMClientStatsView, AdminLLMCacheStatsView,
     AdminSettingsView
 )
 
@@ -41,8 +42,13 @@ urlpatterns = [
     # Reports
     path('reports/', AdminReportsView.as_view(), name='admin-reports'),
     path('reports/<int:pk>/', AdminReportDetailView.as_view(), name='admin-report-detail'),
+    path('reports/<int:pk>/download/', AdminReportDownloadView.as_view(), name='admin-report-download'),
     path('reports/<int:pk>/regenerate/', AdminReportRegenerateView.as_view(), name='admin-report-regenerate'),
     
+    # LLM Clients
+    path('llm-clients/', AdminLLMClientStatsView.as_view(), name='admin-llm-clients'),
+    path('llm-cache/', AdminLLMCacheStatsView.as_view(), name='admin-llm-cache'),
+    
     # Settings
     path('settings/', AdminSettingsView.as_view(), name='admin-settings'),
 ]
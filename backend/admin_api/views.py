@@ -5,28 +5,81 @@ from rest_framework.response import Response
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.gzip import gzip_page
 from datetime import timedelta
 
 from projects.models import (
     ProjectType, Project, Question, Answer,
-    AI_Question, AI_Answer, Project_Report
+    AI_Question, AI_Answer, Project_Report, Report_Job
 )
-from projects.anthropic.prompt import anthropic_prompt
+from projects.anthropic.clients import client_registry
+from projects.anthropic.cache import response_cache
+from projects.serializers import Report_JobSerializer
+from projects.utils.pagination import paginate
+from projects.utils.progress import refresh_progress, refresh_project_type_progress
+from projects.utils.reports import annotate_regeneration_pending, queue_report_job
 
 from .models import Settings
 from .permissions import IsAdminUser
 from .serializers import (
     AdminUserSerializer, AdminUserCreateSerializer, AdminUserUpdateSerializer,
     AdminProjectTypeSerializer, AdminProjectSerializer, AdminQuestionSerializer,
-    AdminAIQuestionSerializer, AdminReportSerializer, SettingsSerializer,
+    AdminAIQuestionSerializer, AdminReportSerializer, AdminReportListSerializer, SettingsSerializer,
     AdminDashboardStatsSerializer
 )
 
 User = get_user_model()
 
 
+# ================== Annotations ==================
+# The admin serializers read these annotations instead of running a query
+# per row, so every list endpoint takes a fixed number of queries.
+
+def count_of(model, field):
+    """Correlated COUNT of the model's rows whose `field` references the outer row."""
+    counts = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def annotate_users(users):
+    return users.annotate(project_count=count_of(Project, 'user'))
+
+
+def annotate_project_types(project_types):
+    # Subqueries rather than two joined Counts, which would multiply rows
+    return project_types.annotate(
+        question_count=count_of(Question, 'project_type'),
+        project_count=count_of(Project, 'project_type')
+    )
+
+
+def annotate_projects(projects):
+    return projects.annotate(
+        has_report=Exists(Project_Report.objects.filter(project=OuterRef('pk')))
+    )
+
+
+def annotate_ai_questions(ai_questions):
+    return ai_questions.annotate(
+        answer_count=count_of(AI_Answer, 'ai_question'),
+        is_answered=Exists(AI_Answer.objects.filter(ai_question=OuterRef('pk')))
+    )
+
+
+def annotate_reports(reports):
+    return annotate_regeneration_pending(reports)
+
+
 class AdminDashboardView(APIView):
     """Dashboard statistics for admin overview."""
     authentication_classes = [TokenAuthentication]
@@ -61,7 +114,7 @@ class AdminUsersView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        users = User.objects.all().order_by('-date_joined')
+        users = annotate_users(User.objects.all())
         
         # Filtering
         role = request.query_params.get('role')
@@ -79,10 +132,12 @@ class AdminUsersView(APIView):
                 Q(username__icontains=search)
             )
         
+        users, next_cursor, count = paginate(request, users, ('-date_joined', 'id'))
         serializer = AdminUserSerializer(users, many=True)
         return Response({
             'results': serializer.data,
-            'count': users.count()
+            'next': next_cursor,
+            'count': count
         })
 
     def post(self, request):
@@ -103,7 +158,7 @@ class AdminUserDetailView(APIView):
 
     def get_object(self, pk):
         try:
-            return User.objects.get(pk=pk)
+            return annotate_users(User.objects.all()).get(pk=pk)
         except User.DoesNotExist:
             return None
 
@@ -181,7 +236,7 @@ class AdminProjectTypesView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        project_types = ProjectType.objects.all().order_by('name')
+        project_types = annotate_project_types(ProjectType.objects.all()).order_by('name')
         
         enabled = request.query_params.get('enabled')
         if enabled is not None:
@@ -208,7 +263,7 @@ class AdminProjectTypeDetailView(APIView):
 
     def get_object(self, pk):
         try:
-            return ProjectType.objects.get(pk=pk)
+            return annotate_project_types(ProjectType.objects.all()).get(pk=pk)
         except ProjectType.DoesNotExist:
             return None
 
@@ -275,9 +330,9 @@ class AdminProjectsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        projects = Project.objects.all().select_related(
+        projects = annotate_projects(Project.objects.all()).select_related(
             'user', 'project_type'
-        ).order_by('-created_at')
+        )
         
         # Filtering
         status_filter = request.query_params.get('status')
@@ -290,11 +345,7 @@ class AdminProjectsView(APIView):
         if project_type:
             projects = projects.filter(project_type_id=project_type)
         if has_report is not None:
-            project_ids_with_reports = Project_Report.objects.values_list('project_id', flat=True)
-            if has_report.lower() == 'true':
-                projects = projects.filter(id__in=project_ids_with_reports)
-            else:
-                projects = projects.exclude(id__in=project_ids_with_reports)
+            projects = projects.filter(has_report=has_report.lower() == 'true')
         if search:
             projects = projects.filter(
                 Q(name__icontains=search) |
@@ -302,10 +353,12 @@ class AdminProjectsView(APIView):
                 Q(user__email__icontains=search)
             )
         
+        projects, next_cursor, count = paginate(request, projects, ('-created_at', 'id'))
         serializer = AdminProjectSerializer(projects, many=True)
         return Response({
             'results': serializer.data,
-            'count': projects.count()
+            'next': next_cursor,
+            'count': count
         })
 
 
@@ -316,7 +369,7 @@ class AdminProjectDetailView(APIView):
 
     def get_object(self, pk):
         try:
-            return Project.objects.select_related('user', 'project_type').get(pk=pk)
+            return annotate_projects(Project.objects.all()).select_related('user', 'project_type').get(pk=pk)
         except Project.DoesNotExist:
             return None
 
@@ -340,6 +393,8 @@ class AdminProjectDetailView(APIView):
         serializer = AdminProjectSerializer(project, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            # The project type may have changed, and with it the questions
+            refresh_progress(Project.objects.filter(pk=project.pk))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -362,9 +417,7 @@ class AdminQuestionsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        questions = Question.objects.all().select_related(
-            'project_type'
-        ).order_by('project_type', 'question_no')
+        questions = Question.objects.all().select_related('project_type')
         
         # Filtering
         project_type = request.query_params.get('project_type')
@@ -375,16 +428,19 @@ class AdminQuestionsView(APIView):
         if enabled is not None:
             questions = questions.filter(enabled=enabled.lower() == 'true')
         
+        questions, next_cursor, count = paginate(request, questions, ('project_type_id', 'question_no', 'id'))
         serializer = AdminQuestionSerializer(questions, many=True)
         return Response({
             'results': serializer.data,
-            'count': questions.count()
+            'next': next_cursor,
+            'count': count
         })
 
     def post(self, request):
         serializer = AdminQuestionSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            question = serializer.save()
+            refresh_project_type_progress(question.project_type_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -417,11 +473,15 @@ class AdminQuestionDetailView(APIView):
                 {'detail': 'Question not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        previous_project_type_id = question.project_type_id
         serializer = AdminQuestionSerializer(
             question, data=request.data, partial=True
         )
         if serializer.is_valid():
-            serializer.save()
+            question = serializer.save()
+            refresh_project_type_progress(question.project_type_id)
+            if question.project_type_id != previous_project_type_id:
+                refresh_project_type_progress(previous_project_type_id)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -433,6 +493,7 @@ class AdminQuestionDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         question.delete()
+        refresh_project_type_progress(question.project_type_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -452,6 +513,7 @@ class AdminQuestionToggleView(APIView):
         
         question.enabled = not question.enabled
         question.save()
+        refresh_project_type_progress(question.project_type_id)
         return Response(AdminQuestionSerializer(question).data)
 
 
@@ -474,15 +536,42 @@ class AdminQuestionReorderView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        for index, question_id in enumerate(question_order, start=1):
-            Question.objects.filter(
-                pk=question_id, 
-                project_type_id=project_type_id
-            ).update(question_no=index)
+        current_order = list(Question.objects.filter(
+            project_type_id=project_type_id
+        ).order_by('question_no').values_list('id', flat=True))
+        if len(set(question_order)) != len(question_order) or not set(question_order) <= set(current_order):
+            return Response(
+                {'detail': 'question_order must list distinct questions of the project type.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Questions left out keep their relative order after the listed ones
+        new_order = list(question_order) + [question_id for question_id in current_order if question_id not in question_order]
+        next_ids = new_order[1:] + [None]
+
+        with transaction.atomic():
+            # Two phases so no intermediate state breaks
+            # unique_together('question_no', 'project_type'): park every row
+            # on a distinct negative number, then set the final numbers and
+            # the next_question chain in one CASE update. update() skips
+            # auto_now, so updated_at is set here for whatever is keyed on it
+            Question.objects.filter(pk__in=new_order).update(question_no=-F('id'))
+            Question.objects.filter(pk__in=new_order).update(
+                question_no=Case(
+                    *[When(pk=question_id, then=Value(index)) for index, question_id in enumerate(new_order, start=1)],
+                    output_field=IntegerField()
+                ),
+                next_question=Case(
+                    *[When(pk=question_id, then=Value(next_id)) for question_id, next_id in zip(new_order, next_ids)],
+                    output_field=IntegerField()
+                ),
+                updated_at=Now()
+            )
+            refresh_project_type_progress(project_type_id)
         
         questions = Question.objects.filter(
             project_type_id=project_type_id
-        ).order_by('question_no')
+        ).select_related('project_type').order_by('question_no')
         
         serializer = AdminQuestionSerializer(questions, many=True)
         return Response({'results': serializer.data})
@@ -496,9 +585,7 @@ class AdminAIQuestionsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        ai_questions = AI_Question.objects.all().select_related(
-            'project'
-        ).order_by('-created_at')
+        ai_questions = annotate_ai_questions(AI_Question.objects.all()).select_related('project')
         
         # Filtering
         project_id = request.query_params.get('project')
@@ -507,16 +594,14 @@ class AdminAIQuestionsView(APIView):
         if project_id:
             ai_questions = ai_questions.filter(project_id=project_id)
         if answered is not None:
-            answered_ids = AI_Answer.objects.values_list('ai_question_id', flat=True)
-            if answered.lower() == 'true':
-                ai_questions = ai_questions.filter(id__in=answered_ids)
-            else:
-                ai_questions = ai_questions.exclude(id__in=answered_ids)
+            ai_questions = ai_questions.filter(is_answered=answered.lower() == 'true')
         
+        ai_questions, next_cursor, count = paginate(request, ai_questions, ('-created_at', 'id'))
         serializer = AdminAIQuestionSerializer(ai_questions, many=True)
         return Response({
             'results': serializer.data,
-            'count': ai_questions.count()
+            'next': next_cursor,
+            'count': count
         })
 
 
@@ -528,26 +613,52 @@ class AdminReportsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        reports = Project_Report.objects.all().select_related(
+        # The report HTML is only sent by the detail and download endpoints
+        reports = annotate_reports(Project_Report.objects.all()).select_related(
             'project', 'project__user'
-        ).order_by('-created_at')
+        ).defer('report')
         
         # Filtering
         search = request.query_params.get('search')
+        report_status = request.query_params.get('status')
         
         if search:
             reports = reports.filter(
                 Q(project__name__icontains=search) |
                 Q(project__user__name__icontains=search)
             )
+        # Mirrors AdminReportSerializer.get_status
+        if report_status == 'ready':
+            reports = reports.filter(size__gt=0)
+        elif report_status == 'pending':
+            reports = reports.filter(size=0)
         
-        serializer = AdminReportSerializer(reports, many=True)
+        reports, next_cursor, count = paginate(request, reports, ('-created_at', 'id'))
+        serializer = AdminReportListSerializer(reports, many=True)
         return Response({
             'results': serializer.data,
-            'count': reports.count()
+            'next': next_cursor,
+            'count': count
         })
 
 
+def get_report_validators(report):
+    """
+    ETag and Last-Modified timestamp of a report, from its metadata only so
+    conditional requests are answered without loading the report HTML.
+    """
+    etag = f'"report-{report.pk}-{report.size}-{int(report.updated_at.timestamp() * 1000000)}"'
+    return etag, int(report.updated_at.timestamp())
+
+
+def set_report_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@method_decorator(gzip_page, name='dispatch')
 class AdminReportDetailView(APIView):
     """Get or delete a specific report."""
     authentication_classes = [TokenAuthentication]
@@ -555,9 +666,10 @@ class AdminReportDetailView(APIView):
 
     def get_object(self, pk):
         try:
-            return Project_Report.objects.select_related(
+            # The report HTML is loaded on first access, after the conditional checks
+            return annotate_reports(Project_Report.objects.all()).select_related(
                 'project', 'project__user'
-            ).get(pk=pk)
+            ).defer('report').get(pk=pk)
         except Project_Report.DoesNotExist:
             return None
 
@@ -568,8 +680,13 @@ class AdminReportDetailView(APIView):
                 {'detail': 'Report not found.'},
                 status=status.HTTP_404_NOT_FOUND
             )
+        etag, last_modified = get_report_validators(report)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
         serializer = AdminReportSerializer(report)
-        return Response(serializer.data)
+        return set_report_validators(Response(serializer.data), etag, last_modified)
 
     def delete(self, request, pk):
         report = self.get_object(pk)
@@ -582,6 +699,30 @@ class AdminReportDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@method_decorator(gzip_page, name='dispatch')
+class AdminReportDownloadView(APIView):
+    """Download the HTML of a report."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, pk):
+        try:
+            report = Project_Report.objects.defer('report').get(pk=pk)
+        except Project_Report.DoesNotExist:
+            return Response(
+                {'detail': 'Report not found.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        etag, last_modified = get_report_validators(report)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = HttpResponse(report.report, content_type='text/html; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="report-{report.pk}.html"'
+        return set_report_validators(response, etag, last_modified)
+
+
 class AdminReportRegenerateView(APIView):
     """Regenerate report for a project."""
     authentication_classes = [TokenAuthentication]
@@ -605,51 +746,58 @@ class AdminReportRegenerateView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Delete existing report
-        Project_Report.objects.filter(project=project).delete()
-        
-        # Generate new report (using existing logic from projects app)
-        try:
-            # Get all answers for this project
-            answers = Answer.objects.filter(project=project).select_related('question')
-            ai_answers = AI_Answer.objects.filter(
-                ai_question__project=project
-            ).select_related('ai_question')
-            
-            if not answers.exists() and not ai_answers.exists():
-                return Response(
-                    {'detail': 'No answers found for this project.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Build answers text
-            answer_text = ""
-            for answer in answers:
-                answer_text += f"Q: {answer.question.text}\nA: {answer.text}\n\n"
-            for ai_answer in ai_answers:
-                answer_text += f"Q (AI): {ai_answer.ai_question.text}\nA: {ai_answer.text}\n\n"
-            
-            # Generate report
-            report_content = anthropic_prompt(
-                f"Generate a comprehensive project requirements report for '{project.name}' "
-                f"(Type: {project.project_type.name}) based on these Q&A:\n\n{answer_text}"
-            )
-            
-            # Save report
-            report = Project_Report.objects.create(
-                project=project,
-                report=report_content
+        if not Answer.objects.filter(project=project).exists() and not AI_Answer.objects.filter(ai_question__project=project).exists():
+            return Response(
+                {'detail': 'No answers found for this project.'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            serializer = AdminReportSerializer(report)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-            
-        except Exception as e:
+
+        # The new version is built in the background (only the sections
+        # affected by changed answers); the current report is served until
+        # it is swapped in
+        report_job = queue_report_job(project, kind='regenerate')
+        if report_job.status == 'failed':
             return Response(
-                {'detail': f'Failed to generate report: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {
+                    'detail': 'Report regeneration is unavailable, please try again later.',
+                    'job': Report_JobSerializer(report_job).data
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
 
+        report = Project_Report.objects.filter(project=project).select_related(
+            'project', 'project__user'
+        ).order_by('-created_at').first()
+        return Response({
+            'detail': 'Report regeneration queued.',
+            'report': AdminReportSerializer(report).data if report else None,
+            'job': Report_JobSerializer(report_job).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+# ================== LLM Clients ==================
+
+class AdminLLMClientStatsView(APIView):
+    """Pooled LLM client stats for the serving process."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        clients = client_registry.stats()
+        return Response({
+            'results': clients,
+            'count': len(clients)
+        })
+
+
+class AdminLLMCacheStatsView(APIView):
+    """LLM response cache hit/miss counters."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response(response_cache.stats())
+
 
 # ================== Settings ==================
 
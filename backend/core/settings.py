@@ -24,6 +24,10 @@ load_dotenv(BASE_DIR / '.env')
 CLAUDE_API_ENV = os.getenv("CLAUDE_API_ENV")
 OPENAI_API_ENV = os.getenv("OPENAI_API_ENV")
 
+# Shared LLM clients (see projects/anthropic/clients.py)
+LLM_CLIENT_TIMEOUT = float(os.getenv("LLM_CLIENT_TIMEOUT", "120"))
+LLM_CLIENT_MAX_RETRIES = int(os.getenv("LLM_CLIENT_MAX_RETRIES", "2"))
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -207,6 +211,107 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
 
+# Caches: the default stays in-process; the LLM response cache is in Redis,
+# shared by every web and worker process
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/1")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "llm": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {
+            "socket_connect_timeout": 1,
+            "socket_timeout": 2,
+        },
+    }
+}
+
+# LLM response cache (see projects/anthropic/cache.py). After a Redis error
+# the shared cache is skipped for LLM_CACHE_L2_RETRY_SECONDS, and hit/miss
+# counters are sent to it at most every LLM_CACHE_STATS_FLUSH_SECONDS.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True") == "True"
+LLM_CACHE_ALIAS = "llm"
+LLM_CACHE_L2_RETRY_SECONDS = int(os.getenv("LLM_CACHE_L2_RETRY_SECONDS", "30"))
+LLM_CACHE_STATS_FLUSH_SECONDS = int(os.getenv("LLM_CACHE_STATS_FLUSH_SECONDS", "60"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(60 * 60 * 24)))
+LLM_CACHE_L1_MAX_ENTRIES = int(os.getenv("LLM_CACHE_L1_MAX_ENTRIES", "256"))
+LLM_CACHE_L1_MAX_BYTES = int(os.getenv("LLM_CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# AI question generation runs once per project; concurrent requests wait for it
+AI_QUESTION_LOCK_TIMEOUT = int(os.getenv("AI_QUESTION_LOCK_TIMEOUT", "180"))
+AI_QUESTION_LOCK_WAIT = int(os.getenv("AI_QUESTION_LOCK_WAIT", "120"))
+# Start generating AI questions in the background once this many predefined
+# questions are left unanswered (0 disables prefetching)
+AI_QUESTION_PREFETCH_REMAINING = int(os.getenv("AI_QUESTION_PREFETCH_REMAINING", "2"))
+# Most answers accepted by one batch answer request (projects/answer_batch/)
+ANSWER_BATCH_MAX_SIZE = int(os.getenv("ANSWER_BATCH_MAX_SIZE", "100"))
+
+# Prompt size budgets in tokens (see projects/anthropic/prompt_builder.py)
+PROMPT_TOKEN_BUDGET_QUESTIONS = int(os.getenv("PROMPT_TOKEN_BUDGET_QUESTIONS", "12000"))
+PROMPT_TOKEN_BUDGET_REPORT = int(os.getenv("PROMPT_TOKEN_BUDGET_REPORT", "12000"))
+PROMPT_TOKENIZER_ENCODING = os.getenv("PROMPT_TOKENIZER_ENCODING", "o200k_base")
+
+# Rolling transcript summary (see projects/utils/questionnaire.py): prompts send
+# the summary plus the most recent answers verbatim. Older answers are folded
+# into the summary in the background once at least MIN_BATCH have piled up.
+TRANSCRIPT_SUMMARY_ENABLED = os.getenv("TRANSCRIPT_SUMMARY_ENABLED", "True") == "True"
+TRANSCRIPT_SUMMARY_KEEP_RECENT = int(os.getenv("TRANSCRIPT_SUMMARY_KEEP_RECENT", "10"))
+TRANSCRIPT_SUMMARY_MIN_BATCH = int(os.getenv("TRANSCRIPT_SUMMARY_MIN_BATCH", "5"))
+TRANSCRIPT_SUMMARY_MAX_TOKENS = int(os.getenv("TRANSCRIPT_SUMMARY_MAX_TOKENS", "1024"))
+TRANSCRIPT_SUMMARY_LOCK_TIMEOUT = int(os.getenv("TRANSCRIPT_SUMMARY_LOCK_TIMEOUT", "180"))
+
+# Report generation: "single" asks for the whole report in one completion,
+# "sections" generates each report section with its own concurrent model call
+# and stitches them in a fixed order (faster, and regenerations only redo the
+# sections affected by changed answers, but every call resends the full
+# prompt). Reports use single mode while an admin custom requirement prompt
+# is set, since it defines its own sections.
+REPORT_GENERATION_MODE = os.getenv("REPORT_GENERATION_MODE", "single")
+REPORT_SECTION_WORKERS = int(os.getenv("REPORT_SECTION_WORKERS", "8"))
+REPORT_SECTION_MAX_TOKENS = int(os.getenv("REPORT_SECTION_MAX_TOKENS", "2048"))
+# Background regenerations of the same project run one at a time
+REPORT_REGENERATION_LOCK_TIMEOUT = int(os.getenv("REPORT_REGENERATION_LOCK_TIMEOUT", "600"))
+# A report job is stopped after SOFT_TIME_LIMIT seconds (killed after
+# TIME_LIMIT). Queued or running jobs not updated for STALE_SECONDS were lost
+# (worker killed, broker message dropped): they are marked failed and a new
+# job is queued instead of reusing them.
+REPORT_JOB_SOFT_TIME_LIMIT = int(os.getenv("REPORT_JOB_SOFT_TIME_LIMIT", "840"))
+REPORT_JOB_TIME_LIMIT = int(os.getenv("REPORT_JOB_TIME_LIMIT", "900"))
+REPORT_JOB_STALE_SECONDS = int(os.getenv("REPORT_JOB_STALE_SECONDS", "1200"))
+
+# Uploaded files are extracted by a background job (see
+# projects/utils/file_context.py). A job that made no progress for
+# RETRY_SECONDS is assumed lost and queued again, as is a failed extraction;
+# background jobs that need the file wait up to WAIT_SECONDS for one in progress.
+FILE_EXTRACTION_RETRY_SECONDS = int(os.getenv("FILE_EXTRACTION_RETRY_SECONDS", "300"))
+FILE_EXTRACTION_WAIT_SECONDS = int(os.getenv("FILE_EXTRACTION_WAIT_SECONDS", "300"))
+
+# Uploaded PDF extraction budget (see projects/utils/file_parser.py)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "200"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", "4"))
+
+# Large uploaded documents are cut into chunks and only the chunks most
+# relevant to the questionnaire go into the prompt (see projects/utils/retrieval.py)
+FILE_CONTEXT_TOKEN_BUDGET = int(os.getenv("FILE_CONTEXT_TOKEN_BUDGET", "3000"))
+FILE_CONTEXT_TOP_K = int(os.getenv("FILE_CONTEXT_TOP_K", "8"))
+FILE_CONTEXT_CHUNK_CHARS = int(os.getenv("FILE_CONTEXT_CHUNK_CHARS", "1500"))
+FILE_CONTEXT_CHUNK_OVERLAP = int(os.getenv("FILE_CONTEXT_CHUNK_OVERLAP", "200"))
+
+# Uploaded images are downscaled and re-encoded before going to the vision model
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", "1536"))
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "JPEG")  # JPEG or WEBP
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+
+# List APIs are cursor-paginated (see projects/utils/pagination.py); clients
+# may ask for up to API_MAX_PAGE_SIZE rows with ?page_size=
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "200"))
+
+
 DJANGO_SUPERUSER_USERNAME = os.getenv("DJANGO_SUPERUSER_USERNAME")
 DJANGO_SUPERUSER_EMAIL = os.getenv("DJANGO_SUPERUSER_EMAIL")
 DJANGO_SUPERUSER_PASSWORD = os.getenv("DJANGO_SUPERUSER_PASSWORD")
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache with per-entry TTL, bounded by
+    both entry count and total size of the stored strings.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value: str, ttl: int):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[2]
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes whitespace so prompts that only differ in line endings or
+    trailing spaces share a cache entry.
+    """
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of LLM responses.
+
+    Entries are keyed by a hash of (model, normalized prompt, image hash,
+    max_tokens). Lookups go to the in-process LRU (L1) first and then to the
+    shared Django cache (Redis, L2). The shared cache is optional: if it is
+    unreachable the cache degrades to L1 only, and after an error L2 is
+    skipped for LLM_CACHE_L2_RETRY_SECONDS so requests don't each wait out
+    its timeouts.
+    """
+    COUNTERS = ("l1_hits", "l2_hits", "misses")
+
+    def __init__(self):
+        self.l1 = LRUCache(
+            max_entries=settings.LLM_CACHE_L1_MAX_ENTRIES,
+            max_bytes=settings.LLM_CACHE_L1_MAX_BYTES,
+        )
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(self.COUNTERS + ("errors",), 0)
+        # Counts not yet added to the shared counters (see _flush_counters)
+        self._unflushed = dict.fromkeys(self.COUNTERS, 0)
+        self._flushed_at = time.monotonic()
+        self._l2_retry_at = 0
+
+    @property
+    def enabled(self):
+        return settings.LLM_CACHE_ENABLED
+
+    @property
+    def l2(self):
+        return caches[settings.LLM_CACHE_ALIAS]
+
+    def make_key(self, model: str, prompt: str, image_url: str = None, max_tokens: int = 4096) -> str:
+        image_hash = hashlib.sha256(image_url.encode("utf-8")).hexdigest() if image_url else ""
+        payload = json.dumps([model, normalize_prompt(prompt), image_hash, max_tokens])
+        return "llm:response:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _l2_available(self):
+        return time.monotonic() >= self._l2_retry_at
+
+    def _l2_failed(self, action: str, error: Exception):
+        print(f"Error {action} LLM response cache, skipping it for {settings.LLM_CACHE_L2_RETRY_SECONDS}s: {error}")
+        self._l2_retry_at = time.monotonic() + settings.LLM_CACHE_L2_RETRY_SECONDS
+        with self._lock:
+            self._counters["errors"] += 1
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+            self._unflushed[counter] += 1
+            due = time.monotonic() - self._flushed_at >= settings.LLM_CACHE_STATS_FLUSH_SECONDS
+        if due:
+            self._flush_counters()
+
+    def _flush_counters(self):
+        """
+        Adds the counts since the last flush to the shared counters, so hit
+        rates can be read across all processes without a Redis round trip
+        per lookup.
+        """
+        with self._lock:
+            unflushed = {counter: count for counter, count in self._unflushed.items() if count}
+            self._unflushed = dict.fromkeys(self.COUNTERS, 0)
+            self._flushed_at = time.monotonic()
+        if not unflushed or not self._l2_available():
+            return
+        try:
+            for counter, count in unflushed.items():
+                key = f"llm:cache:{counter}"
+                if not self.l2.add(key, count, timeout=None):
+                    self.l2.incr(key, count)
+        except Exception as e:
+            self._l2_failed("updating the counters of the", e)
+
+    def get(self, model: str, prompt: str, image_url: str = None, max_tokens: int = 4096):
+        """Returns the cached response or None."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(model, prompt, image_url, max_tokens)
+        response = self.l1.get(key)
+        if response is not None:
+            self._count("l1_hits")
+            return response
+
+        response = None
+        if self._l2_available():
+            try:
+                response = self.l2.get(key)
+            except Exception as e:
+                self._l2_failed("reading the", e)
+
+        if response is not None:
+            self.l1.set(key, response, settings.LLM_CACHE_TTL)
+            self._count("l2_hits")
+            return response
+
+        self._count("misses")
+        return None
+
+    def set(self, model: str, prompt: str, response: str, image_url: str = None, max_tokens: int = 4096):
+        if not self.enabled or not response:
+            return
+
+        key = self.make_key(model, prompt, image_url, max_tokens)
+        self.l1.set(key, response, settings.LLM_CACHE_TTL)
+        if not self._l2_available():
+            return
+        try:
+            self.l2.set(key, response, timeout=settings.LLM_CACHE_TTL)
+        except Exception as e:
+            self._l2_failed("writing the", e)
+
+    def stats(self) -> dict:
+        """Returns the per-process and shared hit/miss counters."""
+        self._flush_counters()
+        with self._lock:
+            local = dict(self._counters)
+
+        shared = {}
+        if self._l2_available():
+            try:
+                values = self.l2.get_many([f"llm:cache:{counter}" for counter in self.COUNTERS])
+                shared = {counter: values.get(f"llm:cache:{counter}", 0) for counter in self.COUNTERS}
+            except Exception as e:
+                self._l2_failed("reading the counters of the", e)
+
+        return {
+            "enabled": self.enabled,
+            "process": local,
+            "shared": shared,
+            "l1_entries": len(self.l1),
+            "l1_bytes": self.l1.size_bytes,
+        }
+
+
+response_cache = ResponseCache()
@@ -1,5 +1,4 @@
-import openai
-import anthropic
+from .clients import get_anthropic_client, get_openai_client
 
 def call_anthropic_model(api_key: str, prompt: str, model: str = "claude-opus-4-20250514") -> str:
     """
@@ -13,7 +12,7 @@ def call_anthropic_model(api_key: str, prompt: str, model: str = "claude-opus-4-
     Returns:
         str: The response from the model.
     """
-    client = anthropic.Anthropic(api_key=api_key)
+    client = get_anthropic_client(api_key)
 
     message = client.messages.create(
         model=model,
@@ -29,7 +28,7 @@ def call_anthropic_model(api_key: str, prompt: str, model: str = "claude-opus-4-
     return message.content[0].text
 
 
-def call_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_url: str = None) -> str:
+def call_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_url: str = None, max_tokens: int = 4096) -> str:
     """
     Calls the OpenAI model with the given prompt and returns the response.
 
@@ -38,13 +37,14 @@ def call_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_ur
         prompt (str): The input prompt to send to the model.
         model (str): The model to use (default is "gpt-4o").
         image_url (str, optional): Base64 encoded image or image URL.
+        max_tokens (int): The maximum number of tokens to generate.
 
     Returns:
         str: The response from the model.
     """
     print("OPEN API KEY: ", api_key)
     print("Prompt: ", prompt)
-    client = openai.OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
 
     content = [{"type": "text", "text": prompt}]
     if image_url:
@@ -57,7 +57,7 @@ def call_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_ur
 
     response = client.chat.completions.create(
         model=model,
-        max_tokens=4096,
+        max_tokens=max_tokens,
         messages=[
             {
                 "role": "user",
@@ -69,3 +69,75 @@ def call_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_ur
     print("OpenAI response: ", response)
     
     return response.choices[0].message.content
+
+
+def stream_anthropic_model(api_key: str, prompt: str, model: str = "claude-opus-4-20250514"):
+    """
+    Streams the Anthropic AI model response for the given prompt.
+
+    Args:
+        api_key (str): The API key for authenticating with the Anthropic service.
+        prompt (str): The input prompt to send to the model.
+        model (str): The model to use.
+
+    Yields:
+        str: The text chunks of the response as they are generated.
+    """
+    client = get_anthropic_client(api_key)
+
+    with client.messages.stream(
+        model=model,
+        max_tokens=4096,
+        messages=[
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    ) as stream:
+        for text in stream.text_stream:
+            yield text
+
+
+def stream_openai_model(api_key: str, prompt: str, model: str = "gpt-4o", image_url: str = None):
+    """
+    Streams the OpenAI model response for the given prompt.
+
+    Args:
+        api_key (str): The API key for authenticating with the OpenAI service.
+        prompt (str): The input prompt to send to the model.
+        model (str): The model to use (default is "gpt-4o").
+        image_url (str, optional): Base64 encoded image or image URL.
+
+    Yields:
+        str: The text chunks of the response as they are generated.
+    """
+    client = get_openai_client(api_key)
+
+    content = [{"type": "text", "text": prompt}]
+    if image_url:
+        content.append({
+            "type": "image_url",
+            "image_url": {
+                "url": image_url
+            }
+        })
+
+    stream = client.chat.completions.create(
+        model=model,
+        max_tokens=4096,
+        stream=True,
+        messages=[
+            {
+                "role": "user",
+                "content": content
+            }
+        ]
+    )
+
+    try:
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        stream.close()
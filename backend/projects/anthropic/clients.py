@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+import time
+
+import openai
+import anthropic
+from django.conf import settings
+
+
+PROVIDERS = {
+    "openai": openai.OpenAI,
+    "anthropic": anthropic.Anthropic,
+}
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of LLM SDK clients.
+
+    Each SDK client owns an HTTP connection pool with keep-alive, so reusing
+    one client per (provider, api key) avoids a new TCP/TLS handshake on every
+    model call. Clients are created lazily and shared between threads.
+
+    Connection pools cannot be shared across a fork (gunicorn / Celery
+    prefork workers), so the registry is dropped in the child process and
+    every worker builds its own clients on first use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._stats = {}
+        self._pid = os.getpid()
+
+    def _key(self, provider: str, api_key: str) -> tuple:
+        # Never keep raw API keys around as dict keys / in stats output
+        digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+        return (provider, digest)
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.reset()
+
+    def get(self, provider: str, api_key: str):
+        """
+        Returns the shared client for the given provider and API key.
+
+        Args:
+            provider (str): Either "openai" or "anthropic".
+            api_key (str): The API key used to authenticate the client.
+
+        Returns:
+            The SDK client instance.
+        """
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+
+        self._check_pid()
+        key = self._key(provider, api_key)
+
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = PROVIDERS[provider](
+                        api_key=api_key,
+                        timeout=settings.LLM_CLIENT_TIMEOUT,
+                        max_retries=settings.LLM_CLIENT_MAX_RETRIES,
+                    )
+                    self._clients[key] = client
+                    self._stats[key] = {
+                        "provider": provider,
+                        "key_id": key[1],
+                        "created_at": time.time(),
+                        "requests": 0,
+                        "last_used_at": None,
+                    }
+
+        with self._lock:
+            stats = self._stats[key]
+            stats["requests"] += 1
+            stats["last_used_at"] = time.time()
+        return client
+
+    def stats(self) -> list:
+        """Returns a snapshot of the pooled clients and their usage."""
+        self._check_pid()
+        with self._lock:
+            return [{**stats, "pid": self._pid} for stats in self._stats.values()]
+
+    def reset(self):
+        """
+        Forgets every cached client. Used after a fork; the inherited sockets
+        belong to the parent so they are dropped without being closed.
+        """
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._stats = {}
+        self._pid = os.getpid()
+
+    def close(self):
+        """Closes every pooled client and empties the registry."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients = {}
+            self._stats = {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Error closing LLM client: {e}")
+
+
+client_registry = ClientRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_registry.reset)
+
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    return client_registry.get("openai", api_key)
+
+
+def get_anthropic_client(api_key: str) -> anthropic.Anthropic:
+    return client_registry.get("anthropic", api_key)
@@ -1,5 +1,103 @@
-from .call_model import call_openai_model
-from core.settings import OPENAI_API_ENV
+import html
+from concurrent.futures import ThreadPoolExecutor
+
+from .call_model import call_openai_model, stream_openai_model
+from .cache import response_cache
+from .prompt_builder import PromptBuilder, compile_template
+from ..utils.retrieval import select_excerpts
+from core.settings import (
+    OPENAI_API_ENV, PROMPT_TOKEN_BUDGET_QUESTIONS, PROMPT_TOKEN_BUDGET_REPORT, TRANSCRIPT_SUMMARY_MAX_TOKENS,
+    REPORT_SECTION_WORKERS, REPORT_SECTION_MAX_TOKENS
+)
+
+
+DEFAULT_QUESTION_PROMPT = compile_template(
+    "You are an AI assistant for getting the project requirements with project info {project_info} from the client.\n Following are the predifined and ai asked questions along with their answers(if available).\n Please ask relevant questions to get the complete requirements from the client based on the below questions and answers if any are missing.\n"
+)
+
+QUESTION_PROMPT_FOOTER = "Please provide only the list of questions semicolon separated that need to be asked to the client to get the complete project requirements. Do not include any other text."
+
+DEFAULT_REQUIREMENT_PROMPT = compile_template("""
+        You are an AI assistant for generating project with project info {project_info} requirements in HTML format should be visually stunning include:
+            • Project overview
+            • Detailed functional requirements
+            • Technical requirements
+            • User stories
+            • Acceptance criteria
+            • Wireframe descriptions (text)
+            • Database schema suggestions
+            • API endpoint list 
+        Excludes:
+            • User flow diagrams
+            • Timeline
+            • Costing
+        Based on the client's answers to the questions asked.\n Following are the questions along with their answers provided by the client.\n Please generate a comprehensive project requirement based on the below answers to be presented to the client.\n"""
+)
+
+
+# Report sections in the order they are stitched together: (key, title)
+REPORT_SECTIONS = [
+    ("overview", "Project overview"),
+    ("functional", "Detailed functional requirements"),
+    ("technical", "Technical requirements"),
+    ("user_stories", "User stories"),
+    ("acceptance_criteria", "Acceptance criteria"),
+    ("wireframes", "Wireframe descriptions (text)"),
+    ("schema", "Database schema suggestions"),
+    ("api", "API endpoint list"),
+]
+
+SECTION_PROMPT_FOOTER = compile_template(
+    "\n\nWrite only the \"{title}\" section of the requirements document, as an HTML fragment: a single <section> element starting with an <h2> heading. Do not include the other sections, <html>, <head>, <body> or <style> tags, or any text outside the fragment.",
+    fields=("title",)
+)
+
+# The report is rendered inside the app's own page, so the stitched document
+# is a fragment without <html>/<head> or styles of its own
+REPORT_DOCUMENT_HEAD = '<article class="project-report">\n<h1>{title}</h1>\n'
+REPORT_DOCUMENT_TAIL = "</article>\n"
+
+
+def strip_code_fence(text: str) -> str:
+    """Removes a surrounding ```html fence the model sometimes adds."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def report_document_head(project_info) -> str:
+    title = html.escape(f"{project_info.get('project_name', 'Project')} - Project Requirements")
+    return REPORT_DOCUMENT_HEAD.format(title=title)
+
+
+def stitch_report(sections: dict, project_info) -> str:
+    """
+    Joins generated section fragments into one HTML document, always in
+    REPORT_SECTIONS order regardless of which call finished first.
+    """
+    parts = [report_document_head(project_info)]
+    for key, _ in REPORT_SECTIONS:
+        if sections.get(key):
+            parts.append(sections[key] + "\n")
+    parts.append(REPORT_DOCUMENT_TAIL)
+    return "".join(parts)
+
+
+SUMMARY_PROMPT = compile_template(
+    "You are an AI assistant keeping a running summary of a client's answers to project requirement questions for the project with project info {project_info}.\n Update the summary below with the new questions and answers. Keep every requirement, constraint, preference and number the client gave, drop filler, and do not add anything that wasn't said. Reply with the updated summary only, as concise bullet points.\n\n"
+)
+
+
+def format_summary(summary: str) -> str:
+    return f"Summary of the client's earlier answers:\n{summary}\n\nMost recent questions and answers:\n\n" if summary else ""
+
+
+def format_question(question) -> str:
+    answer_text = question['answer_text'] or "[No answer provided]"
+    return f"Question: {question['question_text']}\nAnswer: {answer_text}\nAsked by: {question['question_asked_by']}\n\n"
 
 
 def get_custom_prompts():
@@ -16,17 +114,34 @@ def get_custom_prompts():
         return {'question': '', 'requirement': ''}
 
 
+def has_custom_requirement_prompt():
+    """
+    Whether an admin replaced the default requirement prompt, whose sections
+    REPORT_SECTIONS mirrors, with their own.
+    """
+    requirement_prompt = get_custom_prompts().get('requirement', '').strip()
+    try:
+        from admin_api.models import Settings
+        default_prompt = Settings._meta.get_field('requirement_generation_prompt').default.strip()
+    except Exception:
+        default_prompt = ''
+    return bool(requirement_prompt) and requirement_prompt != default_prompt
+
+
 class AnthropicPrompt:
     def __init__(self, api_key: str, model: str = "gpt-4"):
         self.api_key = api_key
         self.model = model
 
-    def get_question_prompt(self, all_questions: list, project_info) -> str:
+    def get_question_prompt(self, all_questions: list, project_info, file_section: str = "", summary: str = "") -> str:
         """
-        Constructs a prompt for the Anthropic model based on a list of questions.
+        Constructs a prompt for the Anthropic model based on a list of questions,
+        trimmed to PROMPT_TOKEN_BUDGET_QUESTIONS tokens.
 
         Args:
             all_questions (list): A list of questions to include in the prompt.
+            file_section (str, optional): Uploaded file text appended to the prompt.
+            summary (str, optional): Rolling summary of the answers not in all_questions.
 
             question struct:
             {
@@ -40,33 +155,37 @@ class AnthropicPrompt:
         custom_prompts = get_custom_prompts()
         custom_question_prompt = custom_prompts.get('question', '')
         
+        builder = PromptBuilder(PROMPT_TOKEN_BUDGET_QUESTIONS)
         if custom_question_prompt:
             # Use custom prompt with project info placeholder
-            prompt = f"{custom_question_prompt}\n\nProject Info: {str(project_info)}\n\n"
+            template = compile_template(custom_question_prompt)
+            if template.has_field("project_info"):
+                builder.add(template.render(project_info=project_info) + "\n\n")
+            else:
+                builder.add(f"{custom_question_prompt}\n\nProject Info: {str(project_info)}\n\n")
         else:
             # Fallback to default prompt
-            prompt = f"You are an AI assistant for getting the project requirements with project info {str(project_info)} from the client.\n Following are the predifined and ai asked questions along with their answers(if available).\n Please ask relevant questions to get the complete requirements from the client based on the below questions and answers if any are missing.\n"
+            builder.add(DEFAULT_QUESTION_PROMPT.render(project_info=project_info))
         
+        builder.add(format_summary(summary))
         for question in all_questions:
-            prompt += f"Question: {question['question_text']}\n"
-            if question['answer_text']:
-                prompt += f"Answer: {question['answer_text']}\n"
-            else:
-                prompt += "Answer: [No answer provided]\n"
-            
-            prompt += f"Asked by: {question['question_asked_by']}\n\n"
+            builder.add_item(format_question(question), low_value=not question['answer_text'])
 
         if not custom_question_prompt:
-            prompt += "Please provide only the list of questions semicolon separated that need to be asked to the client to get the complete project requirements. Do not include any other text."
+            builder.add(QUESTION_PROMPT_FOOTER)
 
-        return prompt
+        builder.add(file_section)
+        return builder.build()
     
-    def get_generating_requirement_prompt(self, all_questions: list, project_info) -> str:
+    def get_generating_requirement_prompt(self, all_questions: list, project_info, file_section: str = "", summary: str = "") -> str:
         """
-        Constructs a prompt for generating project requirements based on a list of questions.
+        Constructs a prompt for generating project requirements based on a list of questions,
+        trimmed to PROMPT_TOKEN_BUDGET_REPORT tokens.
 
         Args:
             all_questions (list): A list of questions to include in the prompt.
+            file_section (str, optional): Uploaded file text appended to the prompt.
+            summary (str, optional): Rolling summary of the answers not in all_questions.
 
             question struct:
             {
@@ -80,67 +199,87 @@ class AnthropicPrompt:
         custom_prompts = get_custom_prompts()
         custom_requirement_prompt = custom_prompts.get('requirement', '')
         
+        builder = PromptBuilder(PROMPT_TOKEN_BUDGET_REPORT)
         if custom_requirement_prompt:
             # Use custom prompt with project info
-            prompt = f"{custom_requirement_prompt}\n\nProject Info: {str(project_info)}\n\nFollowing are the questions along with their answers provided by the client:\n\n"
+            template = compile_template(custom_requirement_prompt)
+            if template.has_field("project_info"):
+                builder.add(template.render(project_info=project_info) + "\n\nFollowing are the questions along with their answers provided by the client:\n\n")
+            else:
+                builder.add(f"{custom_requirement_prompt}\n\nProject Info: {str(project_info)}\n\nFollowing are the questions along with their answers provided by the client:\n\n")
         else:
             # Fallback to default prompt
-            prompt = f"""
-        You are an AI assistant for generating project with project info {str(project_info)} requirements in HTML format should be visually stunning include:
-            • Project overview
-            • Detailed functional requirements
-            • Technical requirements
-            • User stories
-            • Acceptance criteria
-            • Wireframe descriptions (text)
-            • Database schema suggestions
-            • API endpoint list 
-        Excludes:
-            • User flow diagrams
-            • Timeline
-            • Costing
-        Based on the client's answers to the questions asked.\n Following are the questions along with their answers provided by the client.\n Please generate a comprehensive project requirement based on the below answers to be presented to the client.\n"""
+            builder.add(DEFAULT_REQUIREMENT_PROMPT.render(project_info=project_info))
 
+        builder.add(format_summary(summary))
         for question in all_questions:
-            prompt += f"Question: {question['question_text']}\n"
-            if question['answer_text']:
-                prompt += f"Answer: {question['answer_text']}\n"
-            else:
-                prompt += "Answer: [No answer provided]\n"
-            prompt += f"Asked by: {question['question_asked_by']}\n\n"
-        return prompt
+            builder.add_item(format_question(question), low_value=not question['answer_text'])
+
+        builder.add(file_section)
+        return builder.build()
     
-    def get_model_response(self, prompt: str, image_url: str = None) -> str:
+    def get_model_response(self, prompt: str, image_url: str = None, max_tokens: int = 4096, use_cache: bool = True) -> str:
         """
         Calls the Anthropic model with the constructed prompt and returns the response.
+        Identical requests are answered from the response cache.
 
         Args:
             prompt (str): The input prompt to send to the model.
             image_url (str, optional): Base64 encoded image.
+            max_tokens (int): The maximum number of tokens to generate.
+            use_cache (bool): Whether to read and write the response cache.
 
         Returns:
             str: The response from the model.
         """
+        if use_cache:
+            cached = response_cache.get(self.model, prompt, image_url=image_url, max_tokens=max_tokens)
+            if cached is not None:
+                return cached
+
         response = call_openai_model(
             api_key=self.api_key,
             prompt=prompt,
             model=self.model,
-            image_url=image_url
+            image_url=image_url,
+            max_tokens=max_tokens
         )
+
+        if use_cache:
+            response_cache.set(self.model, prompt, response, image_url=image_url, max_tokens=max_tokens)
         return response
     
-    def ask_questions(self, all_questions: list, project_info, file_context=None) -> str:
+    def get_file_excerpt(self, file_context, all_questions: list, project_info, summary: str = "") -> str:
+        """
+        Returns the parts of the uploaded text most relevant to the project
+        and its Q&A so far, within the file context token budget.
+        """
+        query = " ".join(
+            [str(project_info), summary] +
+            [f"{question['question_text']} {question['answer_text'] or ''}" for question in all_questions]
+        )
+        return select_excerpts(
+            file_context['content'],
+            query,
+            index=file_context.get('index'),
+            pages=file_context.get('pages')
+        )
+
+    def ask_questions(self, all_questions: list, project_info, file_context=None, summary: str = "") -> str:
         print("All questions: ", all_questions)
-        prompt = self.get_question_prompt(all_questions, project_info)
         
         image_url = None
+        file_section = ""
         if file_context:
             if file_context['type'] == 'text':
-                prompt += f"\n\nAdditionally, the user has uploaded a file with the following content:\n{file_context['content']}\n\nPlease use this information to ask more specific questions."
+                file_excerpt = self.get_file_excerpt(file_context, all_questions, project_info, summary=summary)
+                file_section = f"\n\nAdditionally, the user has uploaded a file with the following content:\n{file_excerpt}\n\nPlease use this information to ask more specific questions."
             elif file_context['type'] == 'image':
-                prompt += "\n\nAdditionally, the user has uploaded an image. Please analyze the image content to ask more specific questions."
+                file_section = "\n\nAdditionally, the user has uploaded an image. Please analyze the image content to ask more specific questions."
                 image_url = file_context['content']
 
+        prompt = self.get_question_prompt(all_questions, project_info, file_section=file_section, summary=summary)
+
         print("AI question prompt: ", prompt)
         response = self.get_model_response(prompt, image_url=image_url)
         print("Claude Response: ", response)
@@ -148,20 +287,125 @@ class AnthropicPrompt:
         print("Questions: ", questions)
         return questions
     
-    def generate_requirements(self, all_questions: list, project_info, file_context=None) -> str:
-        prompt = self.get_generating_requirement_prompt(all_questions, project_info)
-        
+    def get_model_response_stream(self, prompt: str, image_url: str = None):
+        """
+        Streams the model response for the constructed prompt.
+
+        Args:
+            prompt (str): The input prompt to send to the model.
+            image_url (str, optional): Base64 encoded image.
+
+        Yields:
+            str: The text chunks of the response as they are generated.
+        """
+        cached = response_cache.get(self.model, prompt, image_url=image_url)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
+        for chunk in stream_openai_model(
+            api_key=self.api_key,
+            prompt=prompt,
+            model=self.model,
+            image_url=image_url
+        ):
+            chunks.append(chunk)
+            yield chunk
+
+        response_cache.set(self.model, prompt, "".join(chunks), image_url=image_url)
+
+    def build_requirements_prompt(self, all_questions: list, project_info, file_context=None, summary: str = ""):
+        """
+        Returns the report generation prompt and image (if any) for the project.
+        """
         image_url = None
+        file_section = ""
         if file_context:
             if file_context['type'] == 'text':
-                prompt += f"\n\nAdditionally, the user has uploaded a file with the following content:\n{file_context['content']}\n\nPlease incorporate this information into the requirements."
+                file_excerpt = self.get_file_excerpt(file_context, all_questions, project_info, summary=summary)
+                file_section = f"\n\nAdditionally, the user has uploaded a file with the following content:\n{file_excerpt}\n\nPlease incorporate this information into the requirements."
             elif file_context['type'] == 'image':
-                prompt += "\n\nAdditionally, the user has uploaded an image. Please analyze the image content and incorporate it into the requirements."
+                file_section = "\n\nAdditionally, the user has uploaded an image. Please analyze the image content and incorporate it into the requirements."
                 image_url = file_context['content']
 
+        prompt = self.get_generating_requirement_prompt(all_questions, project_info, file_section=file_section, summary=summary)
+        return prompt, image_url
+    
+    def get_section_prompt(self, title: str, all_questions: list, project_info, file_context=None, summary: str = ""):
+        """
+        Returns the report prompt narrowed down to one section, and the image
+        (if any), as (prompt, image_url).
+
+        Args:
+            title (str): The section title from REPORT_SECTIONS.
+            all_questions (list): The answered questions this section is based on.
+        """
+        prompt, image_url = self.build_requirements_prompt(all_questions, project_info, file_context=file_context, summary=summary)
+        return prompt + SECTION_PROMPT_FOOTER.render(title=title), image_url
+
+    def iter_sections(self, section_prompts: dict):
+        """
+        Generates report sections with concurrent model calls, at most
+        REPORT_SECTION_WORKERS at a time, so the wall-clock time is about that
+        of the slowest section rather than the sum.
+
+        Args:
+            section_prompts (dict): {section key: (prompt, image_url)}.
+
+        Yields:
+            tuple: (section key, HTML fragment) in the order of section_prompts,
+                each as soon as it and the ones before it are done. The first
+                error raised by a section is re-raised.
+        """
+        if not section_prompts:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(REPORT_SECTION_WORKERS, len(section_prompts))))
+        futures = [
+            (key, executor.submit(self.get_model_response, prompt, image_url=image_url, max_tokens=REPORT_SECTION_MAX_TOKENS))
+            for key, (prompt, image_url) in section_prompts.items()
+        ]
+        try:
+            for key, future in futures:
+                yield key, strip_code_fence(future.result())
+        finally:
+            # After a failure or a client disconnect, return without waiting:
+            # calls still queued (beyond REPORT_SECTION_WORKERS) are cancelled,
+            # those already running finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def generate_sections(self, section_prompts: dict) -> dict:
+        """Returns {section key: HTML fragment}, see iter_sections."""
+        return dict(self.iter_sections(section_prompts))
+
+    def generate_requirements(self, all_questions: list, project_info, file_context=None, summary: str = "") -> str:
+        prompt, image_url = self.build_requirements_prompt(all_questions, project_info, file_context=file_context, summary=summary)
+
         response = self.get_model_response(prompt, image_url=image_url)
 
         print("response: ", response)
         return response
 
+    def stream_requirements(self, all_questions: list, project_info, file_context=None, summary: str = ""):
+        prompt, image_url = self.build_requirements_prompt(all_questions, project_info, file_context=file_context, summary=summary)
+
+        yield from self.get_model_response_stream(prompt, image_url=image_url)
+
+    def summarize_transcript(self, summary: str, new_questions: list, project_info) -> str:
+        """
+        Returns the rolling summary updated with the given answered questions.
+
+        Args:
+            summary (str): The current summary, empty when building a new one.
+            new_questions (list): Answered questions (question struct) not yet in the summary.
+        """
+        builder = PromptBuilder(PROMPT_TOKEN_BUDGET_QUESTIONS)
+        builder.add(SUMMARY_PROMPT.render(project_info=project_info))
+        builder.add(f"Current summary:\n{summary or '[empty]'}\n\nNew questions and answers:\n\n")
+        for question in new_questions:
+            builder.add(format_question(question))
+
+        return self.get_model_response(builder.build(), max_tokens=TRANSCRIPT_SUMMARY_MAX_TOKENS)
+
 anthropic_prompt = AnthropicPrompt(api_key=OPENAI_API_ENV)
\ No newline at end of file
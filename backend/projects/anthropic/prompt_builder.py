@@ -0,0 +1,135 @@
+import re
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_failed = False
+
+
+def get_encoding():
+    """
+    Returns the local tiktoken encoding, or None when tiktoken or its BPE
+    file isn't available (the file is downloaded on first use).
+    """
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed or tiktoken is None:
+        return _encoding
+
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                _encoding = tiktoken.get_encoding(settings.PROMPT_TOKENIZER_ENCODING)
+            except Exception as e:
+                print(f"Tokenizer unavailable, estimating token counts: {e}")
+                _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Roughly 4 characters per token for English text
+    return len(text) // 4 + 1
+
+
+class PromptTemplate:
+    """
+    A prompt template compiled once into its literal parts and {field}
+    placeholders. Only the given field names are placeholders, so any other
+    braces in admin-edited prompts are kept as written.
+    """
+
+    def __init__(self, text: str, fields: tuple):
+        self.fields = fields
+        self.parts = []
+        if fields:
+            pattern = re.compile(r"\{(" + "|".join(re.escape(field) for field in fields) + r")\}")
+            position = 0
+            for match in pattern.finditer(text):
+                self.parts.append((False, text[position:match.start()]))
+                self.parts.append((True, match.group(1)))
+                position = match.end()
+            self.parts.append((False, text[position:]))
+        else:
+            self.parts.append((False, text))
+
+    def has_field(self, field: str) -> bool:
+        return any(is_field and value == field for is_field, value in self.parts)
+
+    def render(self, **values) -> str:
+        return "".join(str(values[value]) if is_field else value for is_field, value in self.parts)
+
+
+@lru_cache(maxsize=64)
+def compile_template(text: str, fields: tuple = ("project_info",)) -> PromptTemplate:
+    return PromptTemplate(text, fields)
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from sections within a token budget.
+
+    Fixed sections are always kept. Trimmable items (e.g. Q&A pairs) are
+    dropped when the prompt is over budget: unanswered ones first, then the
+    oldest answered ones. Dropped items are replaced by a one-line note
+    where the first one was. Each section's tokens are counted once.
+    """
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+        self.sections = []
+
+    def add(self, text: str):
+        """Adds a section that is always kept."""
+        if text:
+            self.sections.append({"text": text, "tokens": count_tokens(text), "trimmable": False})
+        return self
+
+    def add_item(self, text: str, low_value: bool = False):
+        """Adds a section that may be dropped to fit the budget."""
+        self.sections.append({
+            "text": text,
+            "tokens": count_tokens(text),
+            "trimmable": True,
+            "low_value": low_value
+        })
+        return self
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(section["tokens"] for section in self.sections)
+
+    def build(self) -> str:
+        tokens = self.total_tokens
+        dropped = set()
+
+        if tokens > self.token_budget:
+            trimmable = [index for index, section in enumerate(self.sections) if section["trimmable"]]
+            # Unanswered items first, then oldest first
+            trimmable.sort(key=lambda index: (not self.sections[index]["low_value"], index))
+            for index in trimmable:
+                if tokens <= self.token_budget:
+                    break
+                dropped.add(index)
+                tokens -= self.sections[index]["tokens"]
+
+        parts = []
+        noted = False
+        for index, section in enumerate(self.sections):
+            if index in dropped:
+                if not noted:
+                    parts.append(f"[{len(dropped)} earlier question(s) omitted to fit the prompt size]\n\n")
+                    noted = True
+                continue
+            parts.append(section["text"])
+        return "".join(parts)
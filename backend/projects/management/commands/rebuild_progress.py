@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from projects.models import Project
+from projects.utils.progress import refresh_progress
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the questionnaire progress counters and next question pointers of projects from their questions and answers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_ids", nargs="*", type=int, help="Only rebuild these projects (default: all).")
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all()
+        if options["project_ids"]:
+            projects = projects.filter(id__in=options["project_ids"])
+        updated = refresh_progress(projects)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt progress of {updated} project(s)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0013_report_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='ai_questions_basis',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0014_project_ai_questions_basis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='File_Context',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('context_type', models.CharField(choices=[('text', 'text'), ('image', 'image')], max_length=20)),
+                ('content', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='file_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
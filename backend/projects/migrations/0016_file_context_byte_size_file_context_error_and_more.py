@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_existing_file_contexts(apps, schema_editor):
+    File_Context = apps.get_model('projects', 'File_Context')
+    Project = apps.get_model('projects', 'Project')
+    # Contexts stored before extraction became asynchronous are complete
+    File_Context.objects.exclude(content="").update(status='done', progress=100)
+    for file_context in File_Context.objects.all():
+        Project.objects.filter(file_hash=file_context.content_hash).update(file_context=file_context)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0015_file_context_project_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file_context',
+            name='byte_size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='file_context',
+            name='error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='file_context',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='file_context',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='file_context',
+            name='status',
+            field=models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='file_context',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='projects.file_context'),
+        ),
+        migrations.AlterField(
+            model_name='file_context',
+            name='context_type',
+            field=models.CharField(blank=True, choices=[('text', 'text'), ('image', 'image')], default='', max_length=20),
+        ),
+        migrations.RunPython(link_existing_file_contexts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0016_file_context_byte_size_file_context_error_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file_context',
+            name='page_offsets',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0017_file_context_page_offsets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file_context',
+            name='payload_bytes',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='file_context',
+            name='vision_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0018_file_context_payload_bytes_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file_context',
+            name='retrieval_index',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0020_transcript_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Report_Section',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('content', models.TextField(blank=True, default='')),
+                ('answer_basis', models.JSONField(blank=True, default=dict)),
+                ('prompt_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='projects.project_report')),
+            ],
+            options={
+                'ordering': ['position'],
+                'unique_together': {('report', 'key')},
+            },
+        ),
+    ]
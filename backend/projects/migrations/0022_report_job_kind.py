@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_report_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report_job',
+            name='kind',
+            field=models.CharField(choices=[('generate', 'generate'), ('regenerate', 'regenerate')], default='generate', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='report_job',
+            name='regenerated_sections',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:26
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_existing_reports(apps, schema_editor):
+    Project_Report = apps.get_model('projects', 'Project_Report')
+    Report_Version = apps.get_model('projects', 'Report_Version')
+    # The current report of each project becomes its first version
+    latest = {}
+    for report in Project_Report.objects.order_by('created_at', 'id'):
+        latest[report.project_id] = report
+    for project_id, report in latest.items():
+        data = zlib.compress(report.report.encode('utf-8'), 9)
+        Report_Version.objects.create(
+            project_id=project_id,
+            version=1,
+            is_delta=False,
+            data=data,
+            content_hash=hashlib.sha256(report.report.encode('utf-8')).hexdigest(),
+            size=len(report.report.encode('utf-8')),
+            stored_bytes=len(data)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0022_report_job_kind'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Report_Version',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('is_delta', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('stored_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_versions', to='projects.project')),
+            ],
+            options={
+                'ordering': ['-version'],
+                'unique_together': {('project', 'version')},
+            },
+        ),
+        migrations.RunPython(record_existing_reports, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:27
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def fill_report_preview_size(apps, schema_editor):
+    Project_Report = apps.get_model('projects', 'Project_Report')
+    for report in Project_Report.objects.all().iterator():
+        report.preview = Truncator(" ".join(strip_tags(report.report.replace("<", " <")).split())).chars(200)
+        report.size = len(report.report.encode('utf-8'))
+        report.save(update_fields=['preview', 'size'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_report_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project_report',
+            name='preview',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='project_report',
+            name='size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_report_preview_size, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0024_project_report_preview_size'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ai_question',
+            index=models.Index(fields=['-created_at', 'id'], name='projects_ai_created_f27362_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_at', 'id'], name='projects_pr_created_d94ad5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['user', '-created_at', 'id'], name='projects_pr_user_id_fdd437_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project_report',
+            index=models.Index(fields=['-created_at', 'id'], name='projects_pr_created_78ff31_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['project_type', 'question_no', 'id'], name='projects_qu_project_1cea0a_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_project_progress(apps, schema_editor):
+    # Same computation as projects.utils.progress.refresh_progress
+    Project = apps.get_model('projects', 'Project')
+    Question = apps.get_model('projects', 'Question')
+    Answer = apps.get_model('projects', 'Answer')
+    AI_Question = apps.get_model('projects', 'AI_Question')
+    AI_Answer = apps.get_model('projects', 'AI_Answer')
+
+    def count(queryset, group_by):
+        counts = queryset.order_by().values(group_by).annotate(count=Count('pk')).values('count')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    enabled_questions = Question.objects.filter(project_type=OuterRef('project_type'), enabled=True)
+    ai_questions = AI_Question.objects.filter(project=OuterRef('pk'))
+    Project.objects.update(
+        predefined_question_total=count(enabled_questions, 'project_type'),
+        ai_question_total=count(ai_questions, 'project'),
+        predefined_answered=count(Answer.objects.filter(project=OuterRef('pk')), 'project'),
+        ai_answered=count(AI_Answer.objects.filter(ai_question__project=OuterRef('pk')), 'ai_question__project'),
+        next_question=Subquery(enabled_questions.filter(
+            ~Exists(Answer.objects.filter(project=OuterRef(OuterRef('pk')), question=OuterRef('pk')))
+        ).order_by('question_no').values('pk')[:1]),
+        next_ai_question=Subquery(ai_questions.filter(
+            ~Exists(AI_Answer.objects.filter(ai_question=OuterRef('pk')))
+        ).order_by('question_no').values('pk')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0025_ai_question_projects_ai_created_f27362_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='ai_answered',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='ai_question_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='next_ai_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.ai_question'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='next_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='projects.question'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='predefined_answered',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='predefined_question_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_project_progress, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 from users.models import User
 # Create your models here.
 
@@ -41,9 +43,61 @@ class Project(models.Model):
     status = models.CharField(max_length=50, default="proposed", choices=STATUS_CHOICES)
     enabled = models.BooleanField(default=True)
     file = models.FileField(upload_to='projects/', null=True, blank=True)
+    file_hash = models.CharField(max_length=64, blank=True, default="")
+    file_context = models.ForeignKey('File_Context', null=True, blank=True, on_delete=models.SET_NULL)
+    # Hashes of the predefined answers the current AI questions were generated from
+    ai_questions_basis = models.JSONField(default=dict, blank=True)
+    # Questionnaire progress, recomputed with every answer / AI question
+    # change (see projects/utils/progress.py)
+    predefined_question_total = models.PositiveIntegerField(default=0)
+    ai_question_total = models.PositiveIntegerField(default=0)
+    predefined_answered = models.PositiveIntegerField(default=0)
+    ai_answered = models.PositiveIntegerField(default=0)
+    next_question = models.ForeignKey('Question', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    next_ai_question = models.ForeignKey('AI_Question', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)    
 
+    class Meta:
+        # Keyset pagination orderings (see projects/utils/pagination.py)
+        indexes = [
+            models.Index(fields=['-created_at', 'id']),
+            models.Index(fields=['user', '-created_at', 'id']),
+        ]
+
+class File_Context(models.Model):
+    """
+    Extracted AI context (text or encoded image) of an uploaded file, stored
+    once per file content hash.
+    """
+    CONTEXT_TYPE_CHOICES = [
+        ('text', 'text'),
+        ('image', 'image')
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('processing', 'processing'),
+        ('done', 'done'),
+        ('failed', 'failed')
+    ]
+    content_hash = models.CharField(max_length=64, unique=True)
+    context_type = models.CharField(max_length=20, choices=CONTEXT_TYPE_CHOICES, blank=True, default="")
+    content = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=20, default="pending", choices=STATUS_CHOICES)
+    progress = models.PositiveSmallIntegerField(default=0)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    # [{"page", "start", "end"}] character offsets of each PDF page in content
+    page_offsets = models.JSONField(default=list, blank=True)
+    # BM25 index over the chunks of text content (see utils/retrieval.py)
+    retrieval_index = models.JSONField(null=True, blank=True)
+    byte_size = models.PositiveBigIntegerField(default=0)
+    # Size of the content sent to the model and estimated image input tokens
+    payload_bytes = models.PositiveBigIntegerField(default=0)
+    vision_tokens = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
 class QuestionType(models.Model):
     name = models.CharField(max_length=250)
     description = models.TextField(blank=True, default="")
@@ -69,6 +123,7 @@ class Question(models.Model):
 
     class Meta:
         unique_together = ('question_no', 'project_type')
+        indexes = [models.Index(fields=['project_type', 'question_no', 'id'])]
 
 
 class Answer(models.Model):
@@ -90,6 +145,7 @@ class AI_Question(models.Model):
 
     class Meta:
         unique_together = ('question_no', 'project')
+        indexes = [models.Index(fields=['-created_at', 'id'])]
 
 class AI_Answer(models.Model):
     ai_question = models.ForeignKey(AI_Question, on_delete=models.CASCADE)
@@ -99,8 +155,122 @@ class AI_Answer(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 
+def make_report_preview(report, length=200):
+    """Plain-text start of a report, shown in lists instead of the full HTML."""
+    # Space out tags so words in adjacent elements don't run together
+    return Truncator(" ".join(strip_tags(report.replace("<", " <")).split())).chars(length)
+
+
 class Project_Report(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
     report = models.TextField()
+    # Kept in sync with report on save, so lists can defer the report column
+    preview = models.CharField(max_length=200, blank=True, default="")
+    size = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "report" in update_fields:
+            self.preview = make_report_preview(self.report)
+            self.size = len(self.report.encode("utf-8"))
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "preview", "size"}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [models.Index(fields=['-created_at', 'id'])]
+
+
+class Report_Section(models.Model):
+    """
+    One section of a report generated in sections mode, with the inputs it
+    was generated from so regeneration can skip sections that didn't change.
+    """
+    report = models.ForeignKey(Project_Report, on_delete=models.CASCADE, related_name="sections")
+    key = models.CharField(max_length=50)
+    position = models.PositiveSmallIntegerField(default=0)
+    content = models.TextField(blank=True, default="")
+    # {question key: hash of question and answer text} of the answers in the section prompt
+    answer_basis = models.JSONField(default=dict, blank=True)
+    # Hash of the full section prompt (answers, project info, file, custom prompt)
+    prompt_hash = models.CharField(max_length=64, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('report', 'key')
+        ordering = ['position']
+
+
+class Report_Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'queued'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed')
+    ]
+    KIND_CHOICES = [
+        ('generate', 'generate'),
+        ('regenerate', 'regenerate')
+    ]
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, default="generate", choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, default="queued", choices=STATUS_CHOICES)
+    # {section key: added/changed/removed answers} of a finished regeneration
+    regenerated_sections = models.JSONField(default=dict, blank=True)
+    task_id = models.CharField(max_length=255, blank=True, default="")
+    report = models.ForeignKey(Project_Report, null=True, blank=True, on_delete=models.SET_NULL)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Transcript_Summary(models.Model):
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name="transcript_summary")
+    summary = models.TextField(blank=True, default="")
+    # Keys of the answers folded into the summary (see get_answered_questions)
+    covered_answers = models.JSONField(default=list, blank=True)
+    # Bumped whenever the summary must be rebuilt, e.g. after an answer is removed
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Report_Version(models.Model):
+    """
+    A version of a project's report. The latest version holds the full
+    compressed HTML; each older one holds a compressed delta against the
+    next newer version (see utils/report_versions.py).
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="report_versions")
+    version = models.PositiveIntegerField()
+    is_delta = models.BooleanField(default=False)
+    data = models.BinaryField()
+    content_hash = models.CharField(max_length=64)
+    # Size of the full report HTML and of what is actually stored, in bytes
+    size = models.PositiveIntegerField(default=0)
+    stored_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('project', 'version')
+        ordering = ['-version']
+
+
+class Project_Lock(models.Model):
+    """
+    A held project lock, used by project_lock (utils/locks.py) while Redis
+    is unreachable. The row exists while the lock is held.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    name = models.CharField(max_length=50)
+    # Identifies the holder, so only it releases the lock
+    token = models.CharField(max_length=32)
+    # Lets the lock be taken over if the holder died without releasing it
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('project', 'name')
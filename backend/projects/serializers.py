@@ -1,15 +1,23 @@
 from rest_framework import serializers
-from .models import ProjectType, Project, Question, Answer, AI_Answer, AI_Question, Project_Report
+from .models import ProjectType, Project, Question, Answer, AI_Answer, AI_Question, Project_Report, Report_Section, Report_Version, Report_Job, File_Context
+from .utils.reports import regeneration_pending
 
 class ProjectTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectType
         fields = ["id", "name", "description", "enabled", "created_at", "updated_at"]
 
+class File_ExtractionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = File_Context
+        fields = ["status", "progress", "page_count", "byte_size", "payload_bytes", "vision_tokens", "error"]
+
 class ProjectSerializer(serializers.ModelSerializer):
+    file_extraction = File_ExtractionSerializer(source="file_context", read_only=True)
+
     class Meta:
         model = Project
-        fields = ["id", "name", "description", "user", "project_type", "industry_type", "status", "enabled", "file", "created_at", "updated_at"]
+        fields = ["id", "name", "description", "user", "project_type", "industry_type", "status", "enabled", "file", "file_extraction", "created_at", "updated_at"]
 
 class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -32,6 +40,32 @@ class AI_AnswerSerializer(serializers.ModelSerializer):
         fields = ["id", "user", "ai_question", "text", "created_at", "updated_at"]
 
 class Project_ReportSerializer(serializers.ModelSerializer):
+    regeneration_pending = serializers.SerializerMethodField()
+
     class Meta:
         model = Project_Report
-        fields = ["id", "project", "report", "created_at", "updated_at"]
+        fields = ["id", "project", "report", "regeneration_pending", "created_at", "updated_at"]
+
+    def get_regeneration_pending(self, obj):
+        # Annotated by views that serialize reports (see annotate_regeneration_pending)
+        regeneration_pending = getattr(obj, "regeneration_pending", None)
+        if regeneration_pending is not None:
+            return regeneration_pending
+        return regeneration_pending(obj.project_id)
+
+class Report_SectionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Report_Section
+        fields = ["key", "position", "content", "answer_basis", "created_at", "updated_at"]
+
+class Report_VersionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Report_Version
+        fields = ["version", "size", "stored_bytes", "created_at"]
+
+class Report_JobSerializer(serializers.ModelSerializer):
+    report = Project_ReportSerializer(read_only=True)
+
+    class Meta:
+        model = Report_Job
+        fields = ["id", "project", "kind", "status", "report", "regenerated_sections", "error", "created_at", "updated_at"]
@@ -0,0 +1,93 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Project, Report_Job
+from .utils.reports import generate_project_report, regenerate_project_report
+from .utils.questionnaire import ensure_ai_questions, regenerate_ai_questions_for_file, update_transcript_summary
+from .utils.locks import LockTimeout
+from .utils.file_context import extract_project_file, FileExtractionPending
+
+
+@shared_task(
+    soft_time_limit=settings.REPORT_JOB_SOFT_TIME_LIMIT,
+    time_limit=settings.REPORT_JOB_TIME_LIMIT,
+    acks_late=True
+)
+def generate_report_task(job_id):
+    """
+    Generates (or regenerates) the report for a queued Report_Job and records
+    the outcome.
+
+    The message is acknowledged once the task finishes, so it is redelivered
+    if the worker is lost before starting it; a job that already started (or
+    was given up on as stale) isn't run again.
+    """
+    claimed = Report_Job.objects.filter(id=job_id, status="queued").update(status="running", updated_at=timezone.now())
+    if not claimed:
+        return
+    job = Report_Job.objects.select_related("project__project_type").get(id=job_id)
+
+    try:
+        if job.kind == "regenerate":
+            report, job.regenerated_sections = regenerate_project_report(job.project)
+        else:
+            report = generate_project_report(job.project)
+    except Exception as e:
+        print(f"Error generating report for project {job.project_id}: {e}")
+        job.status = "failed"
+        job.error = str(e)
+        job.save(update_fields=["status", "error", "updated_at"])
+        return
+
+    job.status = "done"
+    job.report = report
+    job.save(update_fields=["status", "report", "regenerated_sections", "updated_at"])
+
+
+@shared_task
+def prefetch_ai_questions_task(project_id):
+    """
+    Generates the project's AI questions ahead of the end of the predefined
+    questions, so they already exist when the user gets there.
+    """
+    try:
+        project = Project.objects.select_related("project_type").get(id=project_id)
+    except Project.DoesNotExist:
+        return
+
+    try:
+        ensure_ai_questions(project)
+    except (LockTimeout, FileExtractionPending):
+        # Already being generated by a request, or will be by the extraction job
+        pass
+
+
+@shared_task
+def extract_project_file_task(project_id):
+    """
+    Extracts the uploaded file of a project into its File_Context, then
+    generates the AI questions that were waiting on it.
+    """
+    try:
+        project = Project.objects.select_related("file_context").get(id=project_id)
+    except Project.DoesNotExist:
+        return
+
+    if project.file and project.file_context:
+        file_context = extract_project_file(project)
+        if file_context.status == "done":
+            regenerate_ai_questions_for_file(file_context)
+
+
+@shared_task
+def update_transcript_summary_task(project_id):
+    """
+    Folds a project's older answers into its rolling transcript summary.
+    """
+    try:
+        project = Project.objects.select_related("project_type").get(id=project_id)
+    except Project.DoesNotExist:
+        return
+
+    update_transcript_summary(project)
@@ -0,0 +1,363 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import redis
+
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from admin_api.models import Settings
+from users.models import User
+
+from .anthropic.cache import ResponseCache
+from .models import ProjectType, Project, File_Context, Question, Answer, AI_Question, AI_Answer, Project_Report, Report_Job, Project_Lock
+from .utils.locks import project_lock, LockTimeout
+from .utils.progress import progress_update, refresh_progress
+from .tasks import extract_project_file_task
+from .utils.file_context import extract_project_file, get_project_file_context, FileExtractionPending
+from .utils.questionnaire import ensure_ai_questions
+from .utils.reports import generate_project_report
+
+
+class ProjectTestCase(TestCase):
+    """A client's project of a type with three predefined questions, and an API client signed in as the client."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='client', email='client@example.com', role='client')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.project_type = ProjectType.objects.create(name='Web')
+        self.questions = [
+            Question.objects.create(project_type=self.project_type, text=f'Question {number}', question_no=number)
+            for number in range(1, 4)
+        ]
+        for question, next_question in zip(self.questions, self.questions[1:]):
+            question.next_question = next_question
+            question.save()
+        self.project = Project.objects.create(name='Project', user=self.user, project_type=self.project_type)
+        refresh_progress(Project.objects.filter(pk=self.project.pk))
+        self.project.refresh_from_db()
+
+
+class ProgressTests(ProjectTestCase):
+    """The progress counters and next question pointers follow every answer and AI question change."""
+
+    def assertProgress(self, predefined_answered, next_question, ai_question_total=0, ai_answered=0, next_ai_question=None):
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.predefined_question_total, len(self.questions))
+        self.assertEqual(self.project.predefined_answered, predefined_answered)
+        self.assertEqual(self.project.next_question, next_question)
+        self.assertEqual(self.project.ai_question_total, ai_question_total)
+        self.assertEqual(self.project.ai_answered, ai_answered)
+        self.assertEqual(self.project.next_ai_question, next_ai_question)
+
+    def answer(self, question):
+        return self.client.post('/api/projects/answer/', {
+            'question_id': question.id, 'project_id': self.project.id, 'text': 'Answer'
+        }, format='json')
+
+    def test_initial(self):
+        self.assertProgress(0, self.questions[0])
+
+    def test_answer_and_remove(self):
+        first, second, third = self.questions
+        answer_id = self.answer(first).data['data']['id']
+        self.assertProgress(1, second)
+        # Out of order: the next question is still the first unanswered one
+        self.answer(third)
+        self.assertProgress(2, second)
+
+        self.client.post(f'/api/projects/remove_answer/{answer_id}/')
+        self.assertProgress(1, first)
+
+    @mock.patch('projects.views.prefetch_ai_questions_task')
+    def test_batch_answer(self, prefetch_task):
+        first, second, third = self.questions
+        response = self.client.post('/api/projects/answer_batch/', {
+            'project_id': self.project.id,
+            'answers': [
+                {'question_id': first.id, 'question_type': 'predefined', 'text': 'Answer'},
+                {'question_id': second.id, 'question_type': 'predefined', 'text': 'Answer'}
+            ]
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['next_question']['id'], third.id)
+        self.assertEqual(response.data['progress'], {'total_questions': 3, 'current_question_index': 3})
+        self.assertProgress(2, third)
+
+    def test_batch_answer_validation(self):
+        first, second, third = self.questions
+        third.enabled = False
+        third.save()
+        for project_id, answers in [
+            ('abc', [{'question_id': first.id, 'question_type': 'predefined', 'text': 'Answer'}]),
+            (True, [{'question_id': first.id, 'question_type': 'predefined', 'text': 'Answer'}]),
+            (self.project.id, [{'question_id': True, 'question_type': 'predefined', 'text': 'Answer'}]),
+            (self.project.id, [
+                {'question_id': first.id, 'question_type': 'predefined', 'text': 'Answer'},
+                {'question_id': third.id, 'question_type': 'predefined', 'text': 'Answer'}
+            ])
+        ]:
+            response = self.client.post('/api/projects/answer_batch/', {'project_id': project_id, 'answers': answers}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Answer.objects.exists())
+
+    @mock.patch('projects.utils.questionnaire.anthropic_prompt.ask_questions', return_value=['Who uses it?', 'When is it due?'])
+    def test_ai_questions(self, ask_questions):
+        with progress_update(self.project):
+            for question in self.questions:
+                Answer.objects.create(user=self.user, question=question, project=self.project, text='Answer')
+        self.assertProgress(3, None)
+
+        self.assertTrue(ensure_ai_questions(self.project))
+        first, second = AI_Question.objects.filter(project=self.project).order_by('question_no')
+        self.assertProgress(3, None, ai_question_total=2, next_ai_question=first)
+
+        with progress_update(self.project):
+            AI_Answer.objects.create(user=self.user, ai_question=first, text='Staff')
+        self.assertProgress(3, None, ai_question_total=2, ai_answered=1, next_ai_question=second)
+
+    def test_question_changes(self):
+        first, second, third = self.questions
+        self.answer(first)
+        self.client.force_authenticate(User.objects.create(username='admin', email='admin@example.com', role='admin'))
+        self.client.post(f'/api/projects/remove_question/{second.id}/')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.predefined_question_total, 2)
+        self.assertEqual(self.project.next_question, third)
+
+    def test_rebuild_progress(self):
+        self.answer(self.questions[0])
+        Project.objects.filter(pk=self.project.pk).update(predefined_answered=99, ai_question_total=5, next_question=None)
+        call_command('rebuild_progress', self.project.id, stdout=StringIO())
+        self.assertProgress(1, self.questions[1])
+
+
+class QuestionnaireSnapshotTests(ProjectTestCase):
+    """The snapshot answers 304 until something it shows changes."""
+
+    def setUp(self):
+        super().setUp()
+        self.file_context = File_Context.objects.create(content_hash='0' * 64, status='processing', progress=10)
+        self.project.file_context = self.file_context
+        self.project.save()
+        self.url = f'/api/projects/questionnaire/{self.project.id}/'
+
+    def get(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(self.url, **headers)
+
+    def test_not_modified_while_unchanged(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(response['ETag']).status_code, 304)
+
+    def test_reorder_changes_etag(self):
+        etag = self.get()['ETag']
+        admin = User.objects.create(username='admin', email='admin@example.com', role='admin')
+        admin_client = APIClient()
+        admin_client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=admin).key)
+        first, second, third = self.questions
+        admin_client.post(reverse('admin-questions-reorder'), {
+            'project_type_id': self.project_type.id,
+            'question_order': [first.id, third.id, second.id]
+        }, format='json')
+
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([question['id'] for question in response.data['data']['questions']], [first.id, third.id, second.id])
+        self.assertEqual(self.get(response['ETag']).status_code, 304)
+
+    def test_file_extraction_changes_etag(self):
+        etag = self.get()['ETag']
+        self.file_context.status = 'done'
+        self.file_context.progress = 100
+        self.file_context.save()
+
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['project']['file_extraction']['status'], 'done')
+        self.assertEqual(self.get(response['ETag']).status_code, 304)
+
+
+class ReportJobTests(ProjectTestCase):
+
+    def test_job_report_reads_regeneration_pending_annotation(self):
+        report = Project_Report.objects.create(project=self.project, report='<p>Report</p>')
+        report_job = Report_Job.objects.create(project=self.project, kind='generate', status='done', report=report)
+        Report_Job.objects.create(project=self.project, kind='regenerate')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f'/api/projects/report_job/{report_job.id}/')
+        self.assertTrue(response.data['data']['report']['regeneration_pending'])
+        job_queries = [query for query in context.captured_queries if query['sql'].startswith('SELECT') and 'projects_report_job' in query['sql']]
+        self.assertEqual(len(job_queries), 1)
+
+    @mock.patch('projects.tasks.generate_report_task')
+    def test_stale_running_job_is_replaced(self, generate_report_task):
+        generate_report_task.delay.return_value.id = 'task'
+        stale_job = Report_Job.objects.create(project=self.project, kind='generate', status='running')
+        Report_Job.objects.filter(id=stale_job.id).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        response = self.client.get(f'/api/projects/generate_report/{self.project.id}/')
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.data['data']['id'], stale_job.id)
+        generate_report_task.delay.assert_called_once_with(response.data['data']['id'])
+        stale_job.refresh_from_db()
+        self.assertEqual(stale_job.status, 'failed')
+
+    @mock.patch('projects.tasks.generate_report_task')
+    def test_recent_running_job_is_reused(self, generate_report_task):
+        running_job = Report_Job.objects.create(project=self.project, kind='generate', status='running')
+        response = self.client.get(f'/api/projects/generate_report/{self.project.id}/')
+        self.assertEqual(response.data['data']['id'], running_job.id)
+        generate_report_task.delay.assert_not_called()
+
+
+@mock.patch('projects.utils.reports.anthropic_prompt.generate_sections', side_effect=lambda inputs: {key: f'<section>{key}</section>' for key in inputs})
+@mock.patch('projects.utils.reports.anthropic_prompt.generate_requirements', return_value='<p>Report</p>')
+class ReportGenerationModeTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Answer.objects.create(user=self.user, question=self.questions[0], project=self.project, text='An inventory app')
+
+    def test_single_by_default(self, generate_requirements, generate_sections):
+        generate_project_report(self.project)
+        generate_requirements.assert_called_once()
+        generate_sections.assert_not_called()
+
+    @override_settings(REPORT_GENERATION_MODE='sections')
+    def test_sections_with_default_requirement_prompt(self, generate_requirements, generate_sections):
+        generate_project_report(self.project)
+        generate_sections.assert_called_once()
+        generate_requirements.assert_not_called()
+
+    @override_settings(REPORT_GENERATION_MODE='sections')
+    def test_custom_requirement_prompt_keeps_single_mode(self, generate_requirements, generate_sections):
+        settings = Settings.get_settings()
+        settings.requirement_generation_prompt = 'Write an overview and a budget.'
+        settings.save()
+        generate_project_report(self.project)
+        generate_requirements.assert_called_once()
+        generate_sections.assert_not_called()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class FileContextTests(ProjectTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.project.file = SimpleUploadedFile('brief.txt', b'An inventory app for warehouses.')
+        self.project.file_hash = '0' * 64
+        self.project.file_context = File_Context.objects.create(content_hash='0' * 64)
+        self.project.save()
+
+    def answer_all(self):
+        with progress_update(self.project):
+            for question in self.questions:
+                Answer.objects.create(user=self.user, question=question, project=self.project, text='Answer')
+
+    @mock.patch('projects.utils.questionnaire.anthropic_prompt.ask_questions', return_value=['Who uses it?'])
+    def test_ai_questions_wait_for_pending_extraction(self, ask_questions):
+        self.answer_all()
+        with self.assertRaises(FileExtractionPending):
+            ensure_ai_questions(self.project)
+        ask_questions.assert_not_called()
+        self.assertEqual(File_Context.objects.get(pk=self.project.file_context_id).status, 'pending')
+
+        extract_project_file_task(self.project.id)
+        file_context = ask_questions.call_args.kwargs['file_context']
+        self.assertEqual(file_context['content'], 'An inventory app for warehouses.')
+        self.assertTrue(AI_Question.objects.filter(project=self.project).exists())
+
+    def test_next_question_reports_pending_extraction(self):
+        self.answer_all()
+        response = self.client.get(f'/api/projects/get_next_question/{self.project.id}/')
+        self.assertEqual(response.status_code, 503)
+
+    @mock.patch('projects.utils.file_context.get_file_content_as_context')
+    def test_extraction_in_progress_is_not_run_again(self, get_file_content_as_context):
+        File_Context.objects.filter(pk=self.project.file_context_id).update(status='processing', progress=40)
+        self.project.refresh_from_db()
+        file_context = extract_project_file(self.project)
+        self.assertEqual((file_context.status, file_context.progress), ('processing', 40))
+        get_file_content_as_context.assert_not_called()
+
+    @mock.patch('projects.tasks.extract_project_file_task')
+    def test_failed_extraction_is_queued_again_once_stale(self, extract_task):
+        File_Context.objects.filter(pk=self.project.file_context_id).update(status='failed')
+        self.project.refresh_from_db()
+        self.assertIsNone(get_project_file_context(self.project))
+        extract_task.delay.assert_not_called()
+
+        File_Context.objects.filter(pk=self.project.file_context_id).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.project.refresh_from_db()
+        with self.assertRaises(FileExtractionPending):
+            get_project_file_context(self.project)
+        extract_task.delay.assert_called_once_with(self.project.id)
+
+
+@mock.patch('projects.utils.locks.get_redis', side_effect=redis.ConnectionError('Redis is down'))
+class ProjectLockFallbackTests(ProjectTestCase):
+
+    def test_lock_is_scoped_to_its_name(self, get_redis):
+        with project_lock(self.project.id, 'ai_questions', timeout=60, blocking_timeout=0):
+            with self.assertRaises(LockTimeout):
+                with project_lock(self.project.id, 'ai_questions', blocking_timeout=0):
+                    pass
+            with project_lock(self.project.id, 'transcript_summary', blocking_timeout=0):
+                pass
+        self.assertFalse(Project_Lock.objects.exists())
+        with project_lock(self.project.id, 'ai_questions', blocking_timeout=0):
+            pass
+
+    def test_expired_lock_is_taken_over(self, get_redis):
+        Project_Lock.objects.create(project=self.project, name='ai_questions', token='lost', expires_at=timezone.now() - timedelta(seconds=1))
+        with project_lock(self.project.id, 'ai_questions', timeout=60, blocking_timeout=0):
+            self.assertNotEqual(Project_Lock.objects.get().token, 'lost')
+
+
+LLM_LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'llm': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'llm-tests'}
+}
+
+
+@override_settings(CACHES=LLM_LOCMEM_CACHES)
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.cache.l2.clear()
+
+    def test_shared_tier_skipped_after_error(self):
+        with mock.patch.object(ResponseCache, 'l2', new_callable=mock.PropertyMock) as l2:
+            l2.return_value.get.side_effect = ConnectionError('Redis is down')
+            self.assertIsNone(self.cache.get('model', 'prompt'))
+            self.cache.set('model', 'prompt', 'response')
+            self.assertIsNone(self.cache.get('model', 'other prompt'))
+            self.assertEqual(l2.return_value.get.call_count, 1)
+            l2.return_value.set.assert_not_called()
+        self.assertEqual(self.cache.get('model', 'prompt'), 'response')
+
+    @override_settings(LLM_CACHE_STATS_FLUSH_SECONDS=3600)
+    def test_counters_flushed_in_batches(self):
+        self.cache.set('model', 'prompt', 'response')
+        self.cache.get('model', 'prompt')
+        self.cache.get('model', 'other prompt')
+        self.assertIsNone(self.cache.l2.get('llm:cache:misses'))
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['shared'], {'l1_hits': 1, 'l2_hits': 0, 'misses': 1})
+        self.cache.get('model', 'prompt')
+        self.assertEqual(self.cache.stats()['shared']['l1_hits'], 2)
@@ -1,6 +1,6 @@
 # users/urls.py
 from django.urls import path
-from .views import CreateProjectTypesView, RemoveProjectTypesView, GetProjectTypesView, ProjectView, RemoveProjectView, GetOneProjectView, QuestionView, RemoveQuestionView, AnswerView, RemoveAnswerView, AnswerQuestionView, GetNextQuestionView, GenerateReportView
+from .views import CreateProjectTypesView, RemoveProjectTypesView, GetProjectTypesView, ProjectView, RemoveProjectView, GetOneProjectView, QuestionView, RemoveQuestionView, AnswerView, RemoveAnswerView, AnswerQuestionView, BatchAnswerView, QuestionnaireView, GetNextQuestionView, GenerateReportView, StreamReportView, ReportJobView, ReportSectionView, ReportVersionView, ReportVersionDiffView
 
 urlpatterns = [
     path("create_project_type/", CreateProjectTypesView.as_view(), name="create project type"),
@@ -18,6 +18,15 @@ urlpatterns = [
     path("answer/<int:question_id>/<int:project_id>/", AnswerView.as_view()),
     path("remove_answer/<int:answer_id>/", RemoveAnswerView.as_view()),
     path("answer_question/", AnswerQuestionView.as_view()),
+    path("answer_batch/", BatchAnswerView.as_view()),
     path("get_next_question/<int:project_id>/", GetNextQuestionView.as_view()),
-    path("generate_report/<int:project_id>/", GenerateReportView.as_view())
+    path("questionnaire/<int:project_id>/", QuestionnaireView.as_view()),
+    path("generate_report/<int:project_id>/", GenerateReportView.as_view()),
+    path("generate_report_stream/<int:project_id>/", StreamReportView.as_view()),
+    path("report_job/<int:job_id>/", ReportJobView.as_view()),
+    path("report_sections/<int:project_id>/", ReportSectionView.as_view()),
+    path("report_sections/<int:project_id>/<str:key>/", ReportSectionView.as_view()),
+    path("report_versions/<int:project_id>/", ReportVersionView.as_view()),
+    path("report_versions/<int:project_id>/<int:version>/", ReportVersionView.as_view()),
+    path("report_versions/<int:project_id>/diff/<int:from_version>/<int:to_version>/", ReportVersionDiffView.as_view())
 ]
@@ -0,0 +1,183 @@
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import File_Context
+from .file_parser import get_file_content_as_context
+from .retrieval import build_index
+
+
+def hash_file(file):
+    """
+    Returns the sha256 hex digest of an uploaded file or FileField.
+    """
+    digest = hashlib.sha256()
+    file.open("rb")
+    try:
+        for chunk in file.chunks():
+            digest.update(chunk)
+    finally:
+        file.seek(0)
+    return digest.hexdigest()
+
+
+class FileExtractionPending(Exception):
+    """The project's uploaded file is still being extracted."""
+
+
+def extraction_is_stale(file_context):
+    """
+    Whether an unfinished extraction has made no progress for
+    FILE_EXTRACTION_RETRY_SECONDS, i.e. its job was lost or died (or, for a
+    failed one, that it is due another attempt).
+    """
+    return file_context.updated_at < timezone.now() - timedelta(seconds=settings.FILE_EXTRACTION_RETRY_SECONDS)
+
+
+def queue_file_extraction(project):
+    """
+    Links the project to the File_Context of its file content and queues the
+    extraction job if that content hasn't been extracted yet (or a previous
+    attempt failed or went stale).
+    """
+    if not project.file_hash:
+        project.file_hash = hash_file(project.file)
+
+    file_context, created = File_Context.objects.get_or_create(
+        content_hash=project.file_hash,
+        defaults={"byte_size": project.file.size}
+    )
+    project.file_context = file_context
+    project.save(update_fields=["file_hash", "file_context"])
+
+    if created or (file_context.status != "done" and (file_context.status == "failed" or extraction_is_stale(file_context))):
+        # Imported here as the tasks module depends on this one
+        from ..tasks import extract_project_file_task
+        if not created:
+            # Marks the retry as in flight so it isn't queued again meanwhile
+            file_context.status = "pending"
+            file_context.error = ""
+            file_context.save(update_fields=["status", "error", "updated_at"])
+        try:
+            extract_project_file_task.delay(project.id)
+        except Exception as e:
+            print(f"Error queueing file extraction: {e}")
+            file_context.status = "failed"
+            file_context.error = "File extraction could not be queued."
+            file_context.save(update_fields=["status", "error", "updated_at"])
+
+    return file_context
+
+
+def extract_project_file(project):
+    """
+    Parses the project's file and stores the result, status, page count and
+    progress on its File_Context. Runs in the extraction job.
+
+    The File_Context is claimed by atomically moving it to processing, so
+    a file is never extracted twice at once: if another job is already
+    extracting it (and hasn't gone stale), this returns it untouched.
+    """
+    file_context = project.file_context
+    stale_before = timezone.now() - timedelta(seconds=settings.FILE_EXTRACTION_RETRY_SECONDS)
+    claimed = File_Context.objects.filter(pk=file_context.pk).filter(
+        Q(status__in=["pending", "failed"]) | Q(status="processing", updated_at__lt=stale_before)
+    ).update(status="processing", progress=0, error="", updated_at=timezone.now())
+    file_context.refresh_from_db()
+    if not claimed:
+        return file_context
+
+    def update_progress(pages_done, page_count):
+        progress = int(pages_done * 100 / page_count)
+        # Write roughly every 5% rather than on every page
+        if progress - file_context.progress >= 5 or pages_done == page_count:
+            file_context.progress = progress
+            file_context.page_count = page_count
+            file_context.save(update_fields=["progress", "page_count", "updated_at"])
+
+    try:
+        context = get_file_content_as_context(project.file, progress_callback=update_progress)
+    except Exception as e:
+        context = None
+        print(f"Error extracting project file: {e}")
+
+    if not context or not context["content"]:
+        file_context.status = "failed"
+        file_context.error = "No content could be extracted from the file."
+        file_context.save(update_fields=["status", "error", "updated_at"])
+        return file_context
+
+    file_context.context_type = context["type"]
+    file_context.content = context["content"]
+    file_context.page_offsets = context.get("pages", [])
+    file_context.payload_bytes = context.get("payload_bytes", len(context["content"].encode("utf-8")))
+    file_context.vision_tokens = context.get("vision_tokens")
+    if context["type"] == "text":
+        file_context.retrieval_index = build_index(context["content"], file_context.page_offsets)
+    file_context.status = "done"
+    file_context.progress = 100
+    if file_context.page_count is None and context["type"] == "image":
+        file_context.page_count = 1
+    file_context.save()
+    return file_context
+
+
+def wait_for_file_extraction(file_context, timeout):
+    """Polls a File_Context until its extraction is no longer processing, for up to timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while file_context.status == "processing" and time.monotonic() < deadline:
+        time.sleep(1)
+        file_context.refresh_from_db()
+    return file_context
+
+
+def get_project_file_context(project, inline=False):
+    """
+    Returns the AI context of the project's uploaded file, or None if there
+    is no file or it couldn't be extracted.
+
+    Files are extracted by the background job queued at upload, and request
+    handlers only read the stored result: they get FileExtractionPending
+    while it is pending or processing. A lost job and a failed extraction
+    are queued again after FILE_EXTRACTION_RETRY_SECONDS.
+
+    Background jobs pass inline=True to extract the file themselves instead,
+    or, if another job is already extracting it, to wait for that one.
+    """
+    if not project.file:
+        return None
+
+    file_context = project.file_context
+    if file_context is None:
+        file_context = queue_file_extraction(project)
+    elif file_context.status != "done":
+        # The extraction may have moved on since the project was loaded
+        file_context.refresh_from_db()
+
+    if inline and file_context.status != "done":
+        file_context = extract_project_file(project)
+        file_context = wait_for_file_extraction(file_context, settings.FILE_EXTRACTION_WAIT_SECONDS)
+    elif file_context.status != "done":
+        if extraction_is_stale(file_context):
+            file_context = queue_file_extraction(project)
+        # Without a file to wait for, a failed extraction is left out
+        if file_context.status != "failed":
+            raise FileExtractionPending()
+
+    if file_context.status != "done":
+        return None
+
+    if file_context.context_type == "text" and file_context.retrieval_index is None:
+        file_context.retrieval_index = build_index(file_context.content, file_context.page_offsets)
+        file_context.save(update_fields=["retrieval_index", "updated_at"])
+
+    return {
+        "type": file_context.context_type,
+        "content": file_context.content,
+        "pages": file_context.page_offsets,
+        "index": file_context.retrieval_index
+    }
@@ -1,26 +1,208 @@
 import base64
+import math
+import multiprocessing
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
 from io import BytesIO
+from itertools import islice
+from django.conf import settings
 from PyPDF2 import PdfReader
-from PIL import Image
+from PIL import Image, ImageOps
 
-def extract_text_from_pdf(file_path):
+def iter_pdf_pages(file_path, start=0, stop=None):
     """
-    Extracts text from a PDF file.
+    Yields (page_index, text) for the pages of a PDF in [start, stop).
     """
+    reader = PdfReader(file_path)
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for index in range(start, stop):
+        yield index, (reader.pages[index].extract_text() or "").strip()
+
+# The PDF opened by a pool worker (see _open_worker_reader)
+_worker_reader = None
+
+def _open_worker_reader(file_path):
+    # Runs once per worker process, so each worker parses the PDF only once
+    global _worker_reader
+    _worker_reader = PdfReader(file_path)
+
+def _extract_page_range(page_range):
+    start, stop = page_range
+    return [(index, (_worker_reader.pages[index].extract_text() or "").strip()) for index in range(start, stop)]
+
+def _iter_pdf_pages_parallel(file_path, page_limit, workers):
+    """
+    Extracts page ranges in a process pool and yields the pages in order.
+
+    Ranges are submitted as pages are consumed, at most two per worker
+    ahead, so a caller that stops early (e.g. at its character budget)
+    doesn't extract the rest of the document. If the pool fails, the
+    remaining pages are extracted serially.
+    """
+    chunk_size = max(1, -(-page_limit // (workers * 4)))
+    ranges = iter([(start, min(start + chunk_size, page_limit)) for start in range(0, page_limit, chunk_size)])
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_reader, initargs=(file_path,))
+    pending = deque()
+    done = 0
     try:
-        reader = PdfReader(file_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        for page_range in islice(ranges, workers * 2):
+            pending.append((page_range, executor.submit(_extract_page_range, page_range)))
+        while pending:
+            (start, stop), future = pending.popleft()
+            pages = future.result()
+            page_range = next(ranges, None)
+            if page_range:
+                pending.append((page_range, executor.submit(_extract_page_range, page_range)))
+            yield from pages
+            done = stop
+    except Exception as e:
+        print(f"Parallel PDF extraction failed, extracting serially: {e}")
+        yield from iter_pdf_pages(file_path, done, page_limit)
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def extract_pdf_pages(file_path, max_pages=None, max_chars=None, progress_callback=None, workers=None):
+    """
+    Extracts the text of a PDF page by page within a page/character budget.
+
+    Large documents are split into page ranges extracted in a process pool,
+    unless we are already running in a daemonic process (e.g. a Celery
+    prefork worker) that can't have children.
+
+    Args:
+        file_path (str): Path of the PDF.
+        max_pages (int, optional): Only the first max_pages pages are read.
+        max_chars (int, optional): Extraction stops once the text reaches max_chars.
+        progress_callback (callable, optional): Called as progress_callback(pages_done, page_count).
+        workers (int, optional): Process pool size for large documents.
+
+    Returns:
+        dict: {
+            "text": str, pages joined by newlines,
+            "pages": [{"page": int, "start": int, "end": int}], offsets of each page in text,
+            "page_count": int, pages in the document,
+            "truncated": bool, whether the budget cut the document short
+        }
+    """
+    max_pages = settings.PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = settings.PDF_MAX_CHARS if max_chars is None else max_chars
+    workers = settings.PDF_PARALLEL_WORKERS if workers is None else workers
+
+    page_count = len(PdfReader(file_path).pages)
+    page_limit = min(page_count, max_pages) if max_pages else page_count
+
+    if workers > 1 and page_limit >= settings.PDF_PARALLEL_MIN_PAGES and not multiprocessing.current_process().daemon:
+        pages = _iter_pdf_pages_parallel(file_path, page_limit, workers)
+    else:
+        pages = iter_pdf_pages(file_path, 0, page_limit)
+
+    parts = []
+    offsets = []
+    length = 0
+    truncated = page_limit < page_count
+    # Closing the generator when the budget runs out stops the extraction
+    with closing(pages):
+        for index, text in pages:
+            # Pages are joined with "\n"
+            start = length + (1 if parts else 0)
+            if max_chars and start + len(text) > max_chars:
+                text = text[:max(0, max_chars - start)]
+                truncated = True
+            parts.append(text)
+            offsets.append({"page": index + 1, "start": start, "end": start + len(text)})
+            length = start + len(text)
+            if progress_callback:
+                progress_callback(index + 1, page_limit)
+            if max_chars and length >= max_chars:
+                truncated = truncated or index + 1 < page_count
+                break
+
+    if progress_callback and offsets and offsets[-1]["page"] < page_limit:
+        progress_callback(page_limit, page_limit)
+
+    return {
+        "text": "\n".join(parts),
+        "pages": offsets,
+        "page_count": page_count,
+        "truncated": truncated
+    }
+
+def extract_text_from_pdf(file_path, progress_callback=None):
+    """
+    Extracts text from a PDF file, within the configured page/character budget.
+
+    progress_callback(pages_done, page_count) is called as pages are read.
+    """
+    try:
+        return extract_pdf_pages(file_path, progress_callback=progress_callback)["text"]
     except Exception as e:
         print(f"Error extracting text from PDF: {e}")
         return ""
 
-def prepare_image_for_ai(file_path):
+def estimate_vision_tokens(width, height):
+    """
+    Estimates the image input tokens of a high detail vision request: the
+    image is fit in 2048x2048, scaled so the short side is at most 768, and
+    billed 170 tokens per 512px tile plus 85.
+    """
+    scale = min(1, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 170 * math.ceil(width / 512) * math.ceil(height / 512) + 85
+
+def encode_image_for_ai(file_path, max_dimension=None, image_format=None, quality=None):
+    """
+    Downscales an image to max_dimension, re-encodes it (without EXIF or
+    other metadata) and returns it as a data URL for OpenAI's vision model.
+
+    Returns:
+        dict: {
+            "content": str, the data URL,
+            "width": int, "height": int, size sent to the model,
+            "source_bytes": int, size of the uploaded file,
+            "payload_bytes": int, size of the data URL,
+            "vision_tokens": int, estimated image input tokens
+        }
+    """
+    max_dimension = max_dimension or settings.IMAGE_MAX_DIMENSION
+    image_format = (image_format or settings.IMAGE_FORMAT).upper()
+    quality = quality or settings.IMAGE_QUALITY
+
+    with Image.open(file_path) as image:
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=quality, optimize=True)
+        width, height = image.size
+
+    encoded_string = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    content = f"data:image/{image_format.lower()};base64,{encoded_string}"
+    return {
+        "content": content,
+        "width": width,
+        "height": height,
+        "source_bytes": os.path.getsize(file_path),
+        "payload_bytes": len(content),
+        "vision_tokens": estimate_vision_tokens(width, height)
+    }
+
+def encode_original_image(file_path):
     """
-    Encodes an image to base64 for OpenAI's vision model.
+    Encodes an image file to base64 as uploaded, the fallback for images
+    that can't be re-encoded.
     """
     try:
         with open(file_path, "rb") as image_file:
@@ -41,9 +223,21 @@ def prepare_image_for_ai(file_path):
         print(f"Error preparing image for AI: {e}")
         return None
 
-def get_file_content_as_context(file_field):
+def prepare_image_for_ai(file_path):
+    """
+    Encodes an image to base64 for OpenAI's vision model, downscaled and
+    re-encoded when possible.
+    """
+    try:
+        return encode_image_for_ai(file_path)["content"]
+    except Exception as e:
+        print(f"Error re-encoding image, sending the original: {e}")
+    return encode_original_image(file_path)
+
+def get_file_content_as_context(file_field, progress_callback=None):
     """
     Directly takes a FileField and returns context (text or base64 image).
+    progress_callback is passed on to the PDF extractor.
     """
     if not file_field:
         return None
@@ -52,11 +246,18 @@ def get_file_content_as_context(file_field):
     ext = os.path.splitext(file_path)[1].lower()
     
     if ext == '.pdf':
-        text = extract_text_from_pdf(file_path)
-        return {"type": "text", "content": text}
+        try:
+            extracted = extract_pdf_pages(file_path, progress_callback=progress_callback)
+        except Exception as e:
+            print(f"Error extracting text from PDF: {e}")
+            return {"type": "text", "content": ""}
+        return {"type": "text", "content": extracted["text"], "pages": extracted["pages"]}
     elif ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
-        base64_image = prepare_image_for_ai(file_path)
-        return {"type": "image", "content": base64_image}
+        try:
+            return {"type": "image", **encode_image_for_ai(file_path)}
+        except Exception as e:
+            print(f"Error re-encoding image, sending the original: {e}")
+        return {"type": "image", "content": encode_original_image(file_path)}
     else:
         # For other files, maybe try to read as plain text if small
         try:
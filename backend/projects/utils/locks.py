@@ -0,0 +1,110 @@
+import contextlib
+import time
+import uuid
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from ..models import Project_Lock
+
+
+class LockTimeout(Exception):
+    """Raised when a project lock could not be acquired in time."""
+
+
+_redis_client = None
+
+# How often a database lock is retried while waiting for it
+DB_LOCK_POLL_SECONDS = 0.5
+
+
+def get_redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=1,
+            socket_timeout=2,
+        )
+    return _redis_client
+
+
+@contextlib.contextmanager
+def project_lock(project_id, name, timeout=None, blocking_timeout=None):
+    """
+    Cross-process lock scoped to one project, so only one request at a time
+    runs the guarded section (e.g. AI question generation) for that project.
+
+    Uses a Redis lock; if Redis is unreachable it falls back to a
+    Project_Lock row, with the same name, expiry and wait.
+
+    Args:
+        project_id (int): The project to lock.
+        name (str): What the lock guards, so unrelated sections don't contend.
+        timeout (int, optional): Seconds after which the lock expires, in
+            case the holder dies without releasing it.
+        blocking_timeout (int, optional): Seconds to wait for the lock before
+            raising LockTimeout.
+    """
+    lock = None
+    try:
+        lock = get_redis().lock(
+            f"lock:project:{project_id}:{name}",
+            timeout=timeout,
+            blocking_timeout=blocking_timeout,
+        )
+        acquired = lock.acquire()
+    except redis.RedisError as e:
+        print(f"Redis lock unavailable, using database lock: {e}")
+        lock = None
+
+    if lock is None:
+        token = acquire_db_lock(project_id, name, timeout, blocking_timeout)
+        try:
+            yield
+        finally:
+            Project_Lock.objects.filter(project_id=project_id, name=name, token=token).delete()
+        return
+
+    if not acquired:
+        raise LockTimeout(f"Timed out waiting for {name} lock on project {project_id}")
+
+    try:
+        yield
+    finally:
+        try:
+            lock.release()
+        except redis.RedisError:
+            # Lock expired while held; nothing left to release
+            pass
+
+
+def acquire_db_lock(project_id, name, timeout=None, blocking_timeout=None):
+    """
+    Takes the project's named lock by inserting its Project_Lock row, retrying
+    until blocking_timeout, and returns the token that releases it. The row is
+    committed right away, so no transaction stays open while the lock is held.
+    """
+    token = uuid.uuid4().hex
+    deadline = None if blocking_timeout is None else time.monotonic() + blocking_timeout
+    while True:
+        now = timezone.now()
+        Project_Lock.objects.filter(project_id=project_id, name=name, expires_at__lt=now).delete()
+        try:
+            with transaction.atomic():
+                Project_Lock.objects.create(
+                    project_id=project_id,
+                    name=name,
+                    token=token,
+                    expires_at=now + timedelta(seconds=timeout) if timeout else None
+                )
+            return token
+        except IntegrityError:
+            pass
+
+        if deadline is not None and time.monotonic() >= deadline:
+            raise LockTimeout(f"Timed out waiting for {name} lock on project {project_id}")
+        time.sleep(DB_LOCK_POLL_SECONDS)
@@ -0,0 +1,102 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+
+
+def get_page_size(request):
+    """The page_size query param, capped at API_MAX_PAGE_SIZE (API_PAGE_SIZE if not given)."""
+    try:
+        page_size = int(request.query_params.get("page_size", settings.API_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.API_PAGE_SIZE
+    return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+
+def encode_cursor(values):
+    # str() rather than DjangoJSONEncoder, which cuts datetimes to milliseconds
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor, fields):
+    """Returns the ordering values stored in a cursor, converted back to the fields' types."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except Exception:
+        raise NotFound("Invalid cursor.")
+
+
+def after_position(ordering, values):
+    """
+    Filter for the rows after the given position in the ordering, i.e. the
+    keyset condition (a < x) OR (a = x AND b > y) ... for mixed directions.
+    """
+    condition = Q()
+    for index, name in enumerate(ordering):
+        field_name = name.lstrip("-")
+        lookup = "lt" if name.startswith("-") else "gt"
+        term = Q(**{f"{field_name}__{lookup}": values[index]})
+        for previous_name, previous_value in zip(ordering[:index], values[:index]):
+            term &= Q(**{previous_name.lstrip("-"): previous_value})
+        condition |= term
+    return condition
+
+
+def estimate_count(queryset):
+    """
+    The planner's row estimate on PostgreSQL, so counting a large table
+    doesn't scan it. Other databases get an exact count.
+    """
+    if connection.vendor == "postgresql":
+        try:
+            plan = queryset.order_by().explain(format="json")
+            return int(json.loads(plan)[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            print(f"Error estimating row count: {e}")
+    return queryset.count()
+
+
+def paginate(request, queryset, ordering):
+    """
+    Keyset (cursor) pagination: each page continues after the ordering values
+    of the last row of the previous one, so a deep page costs the same as the
+    first. The ordering must end in a unique field (e.g. "id") so that no two
+    rows share a position.
+
+    Query params:
+        cursor: The `next` value of the previous page.
+        page_size: Rows per page, see get_page_size.
+        count: "exact" or "approximate" to include the total row count;
+            skipped by default since it costs another query.
+
+    Returns:
+        tuple: (list of rows, next cursor or None, count or None)
+    """
+    fields = [queryset.model._meta.get_field(name.lstrip("-")) for name in ordering]
+    queryset = queryset.order_by(*ordering)
+
+    count = None
+    count_mode = request.query_params.get("count")
+    if count_mode == "exact":
+        count = queryset.count()
+    elif count_mode == "approximate":
+        count = estimate_count(queryset)
+
+    cursor = request.query_params.get("cursor")
+    page = queryset
+    if cursor:
+        page = queryset.filter(after_position(ordering, decode_cursor(cursor, fields)))
+
+    page_size = get_page_size(request)
+    rows = list(page[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([getattr(rows[-1], field.attname) for field in fields])
+    return rows, next_cursor, count
@@ -0,0 +1,142 @@
+import hashlib
+import json
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, Exists, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ..models import Project, Question, Answer, AI_Question, AI_Answer
+
+
+PROGRESS_FIELDS = [
+    "predefined_question_total", "ai_question_total",
+    "predefined_answered", "ai_answered",
+    "next_question", "next_ai_question"
+]
+
+
+def _count(queryset, group_by):
+    """Correlated COUNT of a queryset filtered on the outer project, grouped by that filter's field."""
+    counts = queryset.order_by().values(group_by).annotate(count=Count("pk")).values("count")
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def refresh_progress(projects):
+    """
+    Recomputes the questionnaire progress fields of the given projects
+    (a queryset) from the question and answer tables, in one UPDATE.
+
+    Counts are of answer rows, so a question answered twice counts twice,
+    as the progress shown to clients always has. The next pending question
+    is the enabled predefined question with the lowest question_no that has
+    no answer, then the lowest numbered unanswered AI question.
+    """
+    enabled_questions = Question.objects.filter(project_type=OuterRef("project_type"), enabled=True)
+    ai_questions = AI_Question.objects.filter(project=OuterRef("pk"))
+
+    return projects.update(
+        predefined_question_total=_count(enabled_questions, "project_type"),
+        ai_question_total=_count(ai_questions, "project"),
+        predefined_answered=_count(Answer.objects.filter(project=OuterRef("pk")), "project"),
+        ai_answered=_count(AI_Answer.objects.filter(ai_question__project=OuterRef("pk")), "ai_question__project"),
+        next_question=Subquery(
+            enabled_questions.filter(
+                ~Exists(Answer.objects.filter(project=OuterRef(OuterRef("pk")), question=OuterRef("pk")))
+            ).order_by("question_no").values("pk")[:1]
+        ),
+        next_ai_question=Subquery(
+            ai_questions.filter(
+                ~Exists(AI_Answer.objects.filter(ai_question=OuterRef("pk")))
+            ).order_by("question_no").values("pk")[:1]
+        )
+    )
+
+
+@contextmanager
+def progress_update(project):
+    """
+    Wraps a change to a project's answers or AI questions so its progress
+    fields are recomputed in the same transaction. The project row is locked
+    first, so concurrent changes to one project are applied one at a time
+    and each recount sees the others.
+
+    Usage:
+        with progress_update(project):
+            Answer.objects.create(...)
+    """
+    with transaction.atomic():
+        list(Project.objects.select_for_update().filter(pk=project.pk).values_list("pk"))
+        yield
+        refresh_progress(Project.objects.filter(pk=project.pk))
+    project.refresh_from_db(fields=PROGRESS_FIELDS)
+
+
+def refresh_project_type_progress(project_type):
+    """Recomputes the progress of every project of a type after its questions changed."""
+    return refresh_progress(Project.objects.filter(project_type=project_type))
+
+
+def get_progress_project(project_id):
+    """Fetches a project with its next pending questions in one query."""
+    return Project.objects.select_related("project_type", "next_question", "next_ai_question").get(id=project_id)
+
+
+def _latest_update(queryset, group_by):
+    latest = queryset.order_by().values(group_by).annotate(latest=Max("updated_at")).values("latest")
+    return Subquery(latest, output_field=DateTimeField())
+
+
+def get_questionnaire_project(project_id):
+    """
+    Fetches a project for the questionnaire snapshot in one query: with its
+    type, owner, file and next pending questions, and annotated with when its
+    questions and answers last changed (see get_questionnaire_validators).
+    """
+    return Project.objects.select_related(
+        "user", "project_type", "file_context", "next_question", "next_ai_question"
+    ).annotate(
+        questions_updated_at=_latest_update(Question.objects.filter(project_type=OuterRef("project_type")), "project_type"),
+        ai_questions_updated_at=_latest_update(AI_Question.objects.filter(project=OuterRef("pk")), "project"),
+        answers_updated_at=_latest_update(Answer.objects.filter(project=OuterRef("pk")), "project"),
+        ai_answers_updated_at=_latest_update(AI_Answer.objects.filter(ai_question__project=OuterRef("pk")), "ai_question__project")
+    ).get(id=project_id)
+
+
+def get_questionnaire_validators(project):
+    """
+    Returns (ETag, last modified timestamp) of a project's questionnaire snapshot from
+    the latest updated_at of the project, its file extraction, questions and
+    answers. The progress counters and the extraction status are part of the
+    ETag so deletions, which leave no updated_at behind, change it too.
+    Question writes that skip save() (e.g. the admin reorder) set updated_at
+    themselves.
+    """
+    file_context = project.file_context
+    timestamps = [
+        project.updated_at, file_context.updated_at if file_context else None,
+        project.questions_updated_at, project.ai_questions_updated_at,
+        project.answers_updated_at, project.ai_answers_updated_at
+    ]
+    last_modified = max(timestamp for timestamp in timestamps if timestamp)
+    state = [timestamp.isoformat() if timestamp else "" for timestamp in timestamps] + [
+        project.predefined_question_total, project.ai_question_total,
+        project.predefined_answered, project.ai_answered,
+        project.next_question_id, project.next_ai_question_id,
+        file_context.status if file_context else None,
+        file_context.progress if file_context else None
+    ]
+    digest = hashlib.sha1(json.dumps(state).encode("utf-8")).hexdigest()
+    return f'"questionnaire-{project.id}-{digest}"', int(last_modified.timestamp())
+
+
+def get_progress(project, has_next_question=True):
+    """
+    Returns the progress shown with a question, read from the project's
+    counters: the total number of questions, and the position of the next
+    one (or of the last answer when there's no next question).
+    """
+    return {
+        "total_questions": project.predefined_question_total + project.ai_question_total,
+        "current_question_index": project.predefined_answered + project.ai_answered + (1 if has_next_question else 0)
+    }
@@ -0,0 +1,324 @@
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from ..models import Question, Answer, AI_Answer, AI_Question, Transcript_Summary
+from ..anthropic.prompt import anthropic_prompt
+from .file_context import get_project_file_context, FileExtractionPending
+from .locks import project_lock, LockTimeout
+from .progress import progress_update
+
+
+def get_project_info(project):
+    """
+    Returns the project details that are passed to the AI prompts.
+    """
+    return {
+        "project_name": project.name,
+        "project_description": project.description,
+        "project_type": project.project_type.name,
+        "project_type_description": project.project_type.description
+    }
+
+
+def get_answered_questions(project, include_ai=True):
+    """
+    Returns the answered predefined (and optionally AI) questions of a project
+    in the question struct used by AnthropicPrompt, in the order they were
+    answered. Each entry also carries an "answer_key" identifying the answer
+    row, used to track which answers the transcript summary covers.
+    """
+    all_questions = []
+
+    answers = Answer.objects.filter(project=project).select_related("question").order_by("created_at", "id")
+    for answer in answers:
+        all_questions.append({
+            "id": answer.question.id,
+            "question_text": answer.question.text,
+            "answer_text": answer.text,
+            "question_asked_by": "predefined",
+            "answer_key": f"predefined:{answer.id}"
+        })
+
+    if include_ai:
+        ai_answers = AI_Answer.objects.filter(ai_question__project=project).select_related("ai_question").order_by("created_at", "id")
+        for answer in ai_answers:
+            all_questions.append({
+                "id": answer.ai_question.question_no,
+                "question_text": answer.ai_question.text,
+                "answer_text": answer.text,
+                "question_asked_by": "ai",
+                "answer_key": f"ai:{answer.id}"
+            })
+
+    return all_questions
+
+
+def get_prompt_transcript(project, include_ai=True, all_questions=None):
+    """
+    Returns the Q&A to send to the model as (summary, questions): the
+    project's rolling summary and the answers it doesn't cover yet, i.e. the
+    most recent ones. Without a usable summary all answers are returned.
+
+    A summary that covers an answer which no longer exists is stale and is
+    ignored until it has been rebuilt.
+
+    Args:
+        all_questions (list, optional): The result of get_answered_questions,
+            if the caller already has it.
+    """
+    if all_questions is None:
+        all_questions = get_answered_questions(project, include_ai=include_ai)
+    if not settings.TRANSCRIPT_SUMMARY_ENABLED:
+        return "", all_questions
+
+    transcript_summary = Transcript_Summary.objects.filter(project=project).first()
+    if not transcript_summary or not transcript_summary.summary:
+        return "", all_questions
+
+    covered = set(transcript_summary.covered_answers)
+    if not covered <= {question["answer_key"] for question in all_questions}:
+        return "", all_questions
+
+    return transcript_summary.summary, [question for question in all_questions if question["answer_key"] not in covered]
+
+
+def update_transcript_summary(project):
+    """
+    Folds answers older than the last TRANSCRIPT_SUMMARY_KEEP_RECENT into the
+    project's rolling summary, once at least TRANSCRIPT_SUMMARY_MIN_BATCH of
+    them are pending. Only the previous summary and the new answers are sent
+    to the model. A stale summary (an answer it covers is gone) is rebuilt
+    from scratch.
+
+    The result is only saved if the summary version didn't change meanwhile;
+    an invalidation during the call queues its own rebuild.
+
+    Returns:
+        bool: True if the summary was updated.
+    """
+    keep_recent = settings.TRANSCRIPT_SUMMARY_KEEP_RECENT
+    min_batch = settings.TRANSCRIPT_SUMMARY_MIN_BATCH
+
+    try:
+        with project_lock(project.id, "transcript_summary", timeout=settings.TRANSCRIPT_SUMMARY_LOCK_TIMEOUT, blocking_timeout=0):
+            transcript_summary, _ = Transcript_Summary.objects.get_or_create(project=project)
+            version = transcript_summary.version
+
+            all_questions = get_answered_questions(project)
+            answer_keys = [question["answer_key"] for question in all_questions]
+
+            summary = transcript_summary.summary
+            covered = transcript_summary.covered_answers
+            if not set(covered) <= set(answer_keys):
+                summary, covered = "", []
+
+            older = all_questions[:-keep_recent] if keep_recent > 0 else all_questions
+            pending = [question for question in older if question["answer_key"] not in covered]
+            if len(pending) < max(min_batch, 1):
+                return False
+
+            new_summary = anthropic_prompt.summarize_transcript(summary, pending, get_project_info(project))
+            if not new_summary.strip():
+                return False
+
+            covered = set(covered) | {question["answer_key"] for question in pending}
+            updated = Transcript_Summary.objects.filter(id=transcript_summary.id, version=version).update(
+                summary=new_summary.strip(),
+                covered_answers=[key for key in answer_keys if key in covered]
+            )
+            return bool(updated)
+    except LockTimeout:
+        # Another worker is updating it; it will pick up these answers next time
+        return False
+
+
+def queue_transcript_summary(project):
+    """
+    Queues a background summary update when enough answers are waiting to be
+    folded into the summary.
+    """
+    if not settings.TRANSCRIPT_SUMMARY_ENABLED:
+        return
+
+    answered = Answer.objects.filter(project=project).count() + AI_Answer.objects.filter(ai_question__project=project).count()
+    covered = Transcript_Summary.objects.filter(project=project).values_list("covered_answers", flat=True).first() or []
+    if answered - len(covered) - settings.TRANSCRIPT_SUMMARY_KEEP_RECENT < settings.TRANSCRIPT_SUMMARY_MIN_BATCH:
+        return
+
+    from ..tasks import update_transcript_summary_task
+    try:
+        update_transcript_summary_task.delay(project.id)
+    except Exception as e:
+        # Not fatal: prompts fall back to the raw answers
+        print(f"Error queueing transcript summary update: {e}")
+
+
+def invalidate_transcript_summary(project):
+    """
+    Discards the project's summary after an answer was edited or removed and
+    queues a rebuild. Bumping the version stops an update that is already
+    running from saving a summary of the old answers.
+    """
+    Transcript_Summary.objects.filter(project=project).update(
+        summary="",
+        covered_answers=[],
+        version=F("version") + 1
+    )
+    queue_transcript_summary(project)
+
+
+def get_answer_basis(project):
+    """
+    Returns {question_id: hash of latest answer text} for the project's
+    predefined answers, plus under "file" the content hash of its uploaded
+    file if it was extracted, used to tell whether AI questions are still
+    current.
+    """
+    basis = {}
+    for question_id, text in Answer.objects.filter(project=project).order_by("created_at", "id").values_list("question_id", "text"):
+        basis[str(question_id)] = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    file_context = project.file_context if project.file else None
+    basis["file"] = file_context.content_hash if file_context and file_context.status == "done" else ""
+    return basis
+
+
+def ai_questions_are_stale(project):
+    """
+    AI questions are stale when an answer they were generated from has since
+    been changed or removed, or when the uploaded file they were generated
+    without (its extraction had failed) has since been extracted. Answers
+    given after generation (e.g. after a prefetch) don't invalidate them.
+    """
+    if not project.ai_questions_basis:
+        return False
+    current = get_answer_basis(project)
+    return any(current.get(question_id) != digest for question_id, digest in project.ai_questions_basis.items())
+
+
+def has_current_ai_questions(project):
+    if not AI_Question.objects.filter(project=project).exists():
+        return False
+    # Once the user has started answering them the batch is kept as is
+    if AI_Answer.objects.filter(ai_question__project=project).exists():
+        return True
+    return not ai_questions_are_stale(project)
+
+
+def should_prefetch_ai_questions(project):
+    """
+    Whether the AI question batch should be generated ahead of time, i.e. the
+    user is within AI_QUESTION_PREFETCH_REMAINING predefined questions of the
+    end and no batch exists yet.
+    """
+    prefetch_remaining = settings.AI_QUESTION_PREFETCH_REMAINING
+    if prefetch_remaining <= 0:
+        return False
+
+    if AI_Question.objects.filter(project=project).exists():
+        return False
+
+    remaining = Question.objects.filter(
+        project_type=project.project_type,
+        enabled=True
+    ).exclude(id__in=Answer.objects.filter(project=project).values_list("question_id", flat=True)).count()
+    return 0 < remaining <= prefetch_remaining
+
+
+def create_ai_question_chain(project, ai_question_texts):
+    """
+    Stores generated AI questions as the project's chain: numbered from 1
+    in order, each linked to the next through next_question. Blank entries
+    are skipped. The rows are inserted with one bulk_create and linked with
+    one bulk_update, in a transaction.
+
+    Returns:
+        list: The created AI_Question rows, in order.
+    """
+    ai_questions = [
+        AI_Question(project=project, text=text.strip(), question_no=ques_no)
+        for ques_no, text in enumerate((text for text in ai_question_texts if text.strip()), start=1)
+    ]
+    if not ai_questions:
+        return []
+
+    with transaction.atomic():
+        # Primary keys are set by bulk_create, so the links can only be added after it
+        AI_Question.objects.bulk_create(ai_questions)
+        for ai_question, next_ai_question in zip(ai_questions, ai_questions[1:]):
+            ai_question.next_question = next_ai_question
+        if len(ai_questions) > 1:
+            AI_Question.objects.bulk_update(ai_questions[:-1], ["next_question"])
+    return ai_questions
+
+
+def ensure_ai_questions(project):
+    """
+    Generates the project's AI question chain unless a current one exists.
+    A prefetched chain whose source answers changed before any AI question
+    was answered is discarded and regenerated.
+
+    Concurrent callers for the same project are coalesced: the first one
+    calls the model while the rest wait on the project lock and then reuse
+    the questions it created. Raises LockTimeout if the wait runs out.
+
+    The questions wait for the uploaded file: FileExtractionPending is
+    raised while it is being extracted, and the extraction job generates
+    them once it is done (see regenerate_ai_questions_for_file).
+
+    Returns:
+        bool: True if this call generated the questions.
+    """
+    if has_current_ai_questions(project):
+        return False
+
+    # Raises FileExtractionPending before anyone waits on the lock
+    get_project_file_context(project)
+
+    with project_lock(
+        project.id,
+        "ai_questions",
+        timeout=settings.AI_QUESTION_LOCK_TIMEOUT,
+        blocking_timeout=settings.AI_QUESTION_LOCK_WAIT
+    ):
+        # Another request may have generated them while we were waiting
+        project.refresh_from_db(fields=["ai_questions_basis"])
+        if has_current_ai_questions(project):
+            return False
+
+        file_context = get_project_file_context(project)
+        basis = get_answer_basis(project)
+        summary, all_questions = get_prompt_transcript(project, include_ai=False)
+        project_info = get_project_info(project)
+        ai_questions = anthropic_prompt.ask_questions(all_questions, project_info, file_context=file_context, summary=summary)
+
+        with progress_update(project):
+            # Drop a stale prefetched batch (nothing answered yet)
+            AI_Question.objects.filter(project=project).delete()
+            create_ai_question_chain(project, ai_questions)
+
+            project.ai_questions_basis = basis
+            project.save(update_fields=["ai_questions_basis"])
+
+    return True
+
+
+def regenerate_ai_questions_for_file(file_context):
+    """
+    Generates the AI questions that were waiting on an uploaded file, once
+    it has been extracted: for each project with that file whose questions
+    are due (see should_prefetch_ai_questions) or were generated without it.
+    Runs in the extraction job.
+    """
+    projects = file_context.project_set.select_related("project_type", "file_context")
+    for project in projects:
+        due = project.next_question_id is None or should_prefetch_ai_questions(project)
+        if not due and not AI_Question.objects.filter(project=project).exists():
+            continue
+        try:
+            ensure_ai_questions(project)
+        except (LockTimeout, FileExtractionPending):
+            # Being generated by a request, or the file went back to pending
+            pass
@@ -0,0 +1,123 @@
+import difflib
+import hashlib
+import json
+import zlib
+
+from django.db import transaction
+
+from ..models import Project, Report_Version
+
+
+def compress(text):
+    return zlib.compress(text.encode("utf-8"), 9)
+
+
+def decompress(data):
+    return zlib.decompress(bytes(data)).decode("utf-8")
+
+
+def make_delta(source, target):
+    """
+    Encodes target as line-based edits of source: a JSON list whose items
+    are either [start, end] (copy source lines start:end) or a string
+    (literal text).
+    """
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+
+    delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(target_lines[j1:j2]))
+    return json.dumps(delta, separators=(",", ":"))
+
+
+def apply_delta(source, delta):
+    source_lines = source.splitlines(keepends=True)
+    parts = []
+    for item in json.loads(delta):
+        if isinstance(item, list):
+            parts.extend(source_lines[item[0]:item[1]])
+        else:
+            parts.append(item)
+    return "".join(parts)
+
+
+def hash_report(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def record_report_version(project_id, text):
+    """
+    Stores text as the project's newest report version, unless it is the
+    same as the current one. The previous newest version is rewritten as a
+    delta against the new one, so each version only adds the size of its
+    edits.
+
+    Returns:
+        Report_Version: The newest version.
+    """
+    content_hash = hash_report(text)
+    with transaction.atomic():
+        # Locking the newest version alone locks nothing before the first
+        # one exists, so concurrent first reports would both pick version 1
+        list(Project.objects.select_for_update().filter(pk=project_id).values_list("pk"))
+        latest = Report_Version.objects.filter(project_id=project_id).order_by("-version").first()
+        if latest and latest.content_hash == content_hash:
+            return latest
+
+        if latest:
+            delta = compress(make_delta(text, decompress(latest.data)))
+            latest.data = delta
+            latest.is_delta = True
+            latest.stored_bytes = len(delta)
+            latest.save(update_fields=["data", "is_delta", "stored_bytes"])
+
+        data = compress(text)
+        return Report_Version.objects.create(
+            project_id=project_id,
+            version=latest.version + 1 if latest else 1,
+            is_delta=False,
+            data=data,
+            content_hash=content_hash,
+            size=len(text.encode("utf-8")),
+            stored_bytes=len(data)
+        )
+
+
+def get_report_version_text(project_id, version):
+    """
+    Rebuilds the report HTML of a version by applying the deltas from the
+    newest version down. Returns None if the version doesn't exist.
+    """
+    versions = Report_Version.objects.filter(project_id=project_id, version__gte=version).order_by("-version")
+    text = None
+    found = False
+    for report_version in versions.iterator():
+        if text is None:
+            text = decompress(report_version.data)
+        else:
+            text = apply_delta(text, decompress(report_version.data))
+        found = report_version.version == version
+    return text if found else None
+
+
+def diff_report_versions(project_id, from_version, to_version):
+    """
+    Returns a unified diff between two report versions, or None if either
+    doesn't exist.
+    """
+    from_text = get_report_version_text(project_id, from_version)
+    to_text = get_report_version_text(project_id, to_version)
+    if from_text is None or to_text is None:
+        return None
+
+    return "".join(difflib.unified_diff(
+        from_text.splitlines(keepends=True),
+        to_text.splitlines(keepends=True),
+        fromfile=f"version {from_version}",
+        tofile=f"version {to_version}"
+    ))
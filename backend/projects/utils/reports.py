@@ -0,0 +1,350 @@
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from ..models import Project_Report, Report_Section, Report_Job
+from ..anthropic.prompt import anthropic_prompt, has_custom_requirement_prompt, REPORT_SECTIONS, stitch_report, report_document_head, REPORT_DOCUMENT_TAIL
+from .file_context import get_project_file_context
+from .questionnaire import get_answered_questions, get_prompt_transcript, get_project_info
+from .locks import project_lock
+from .report_versions import record_report_version
+from .retrieval import tokenize
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+# Words that route an answer to a report section. The overview is based on
+# every answer; answers that match no section go to DEFAULT_SECTIONS.
+SECTION_KEYWORDS = {
+    key: frozenset(_stem(word) for word in words.split())
+    for key, words in {
+        "functional": "feature function functionality allow manage workflow page screen login signup register search filter "
+                      "notification payment checkout booking order cart dashboard report admin upload download share message chat",
+        "technical": "technology technical stack platform hosting host cloud server performance speed security secure scalability scale "
+                     "integration integrate mobile web ios android framework language browser offline load backup deploy",
+        "user_stories": "user customer client role admin persona visitor member staff manager want need goal",
+        "acceptance_criteria": "must should require requirement able success validation validate error limit rule",
+        "wireframes": "page screen layout design ui ux look feel brand color theme navigation menu dashboard mobile responsive",
+        "schema": "data store storage record field information profile account order product inventory history database "
+                  "catalog category transaction",
+        "api": "integration integrate api third party service payment login authentication auth notification sms email "
+               "sync external webhook gateway",
+    }.items()
+}
+DEFAULT_SECTIONS = ("functional", "user_stories", "acceptance_criteria")
+
+
+def get_question_key(question):
+    """Identifies a question across regenerations, even if its answer was replaced."""
+    return f"{question['question_asked_by']}:{question['id']}"
+
+
+def hash_answer(question):
+    return hashlib.sha1(f"{question['question_text']}\n{question['answer_text'] or ''}".encode("utf-8")).hexdigest()
+
+
+def route_questions(all_questions):
+    """
+    Assigns each answered question to the report sections it is relevant to,
+    so a changed answer only invalidates those sections.
+
+    Returns:
+        dict: {section key: [question struct]} for every key in REPORT_SECTIONS.
+    """
+    routed = {key: [] for key, _ in REPORT_SECTIONS}
+    for question in all_questions:
+        words = {_stem(word) for word in tokenize(f"{question['question_text']} {question['answer_text'] or ''}")}
+        matches = [key for key, keywords in SECTION_KEYWORDS.items() if words & keywords]
+        for key in matches or DEFAULT_SECTIONS:
+            routed[key].append(question)
+    for key in routed:
+        # The overview, and sections nothing was routed to, use every answer
+        if key == "overview" or not routed[key]:
+            routed[key] = list(all_questions)
+    return routed
+
+
+def build_section_prompts(project, file_context=None):
+    """
+    Builds the prompt of every report section from the answers routed to it.
+
+    Returns:
+        dict: {section key: {"prompt", "image_url", "answer_basis", "prompt_hash"}}
+            in REPORT_SECTIONS order.
+    """
+    all_questions = get_answered_questions(project)
+    summary, recent_questions = get_prompt_transcript(project, all_questions=all_questions)
+    project_info = get_project_info(project)
+    routed = route_questions(all_questions)
+
+    section_prompts = {}
+    for key, title in REPORT_SECTIONS:
+        if key == "overview":
+            # The overview covers everything, so it gets the rolling summary
+            prompt, image_url = anthropic_prompt.get_section_prompt(title, recent_questions, project_info, file_context=file_context, summary=summary)
+        else:
+            prompt, image_url = anthropic_prompt.get_section_prompt(title, routed[key], project_info, file_context=file_context)
+
+        prompt_hash = hashlib.sha256(json.dumps([
+            anthropic_prompt.model,
+            prompt,
+            hashlib.sha256(image_url.encode("utf-8")).hexdigest() if image_url else ""
+        ]).encode("utf-8")).hexdigest()
+
+        section_prompts[key] = {
+            "prompt": prompt,
+            "image_url": image_url,
+            "answer_basis": {get_question_key(question): hash_answer(question) for question in routed[key]},
+            "prompt_hash": prompt_hash
+        }
+    return section_prompts
+
+
+def diff_answer_basis(old, new):
+    """Returns the question keys added, changed and removed between two answer bases."""
+    return {
+        "added": sorted(key for key in new if key not in old),
+        "changed": sorted(key for key in new if key in old and old[key] != new[key]),
+        "removed": sorted(key for key in old if key not in new)
+    }
+
+
+def save_report_sections(project, section_prompts, fragments, report=None, replace=False):
+    """
+    Stores generated section fragments on the report (creating it if needed)
+    and re-stitches the report HTML from all of its sections. Everything is
+    written in one transaction, so readers see either the old or the new
+    report, never a mix.
+
+    Args:
+        replace (bool): Delete the project's other reports in the same
+            transaction as creating the new one.
+    """
+    positions = {key: position for position, (key, _) in enumerate(REPORT_SECTIONS)}
+    with transaction.atomic():
+        if report is None:
+            report = Project_Report.objects.create(project=project, report="")
+            if replace:
+                Project_Report.objects.filter(project=project).exclude(id=report.id).delete()
+
+        for key, content in fragments.items():
+            Report_Section.objects.update_or_create(
+                report=report,
+                key=key,
+                defaults={
+                    "position": positions[key],
+                    "content": content,
+                    "answer_basis": section_prompts[key]["answer_basis"],
+                    "prompt_hash": section_prompts[key]["prompt_hash"]
+                }
+            )
+
+        contents = dict(Report_Section.objects.filter(report=report).values_list("key", "content"))
+        report.report = stitch_report(contents, get_project_info(project))
+        report.save(update_fields=["report", "updated_at"])
+        record_report_version(project.id, report.report)
+    return report
+
+
+def use_section_generation():
+    """
+    Whether reports are generated section by section (REPORT_GENERATION_MODE
+    "sections"). An admin custom requirement prompt defines its own report
+    structure, which the fixed sections would override, so it keeps reports
+    in single mode.
+    """
+    return settings.REPORT_GENERATION_MODE == "sections" and not has_custom_requirement_prompt()
+
+
+def _section_model_inputs(section_prompts):
+    return {key: (section["prompt"], section["image_url"]) for key, section in section_prompts.items()}
+
+
+def generate_project_report(project, replace=False):
+    """
+    Generates the requirement report for a project from its answered
+    questions and uploaded file, and stores it as the project's report.
+
+    Args:
+        replace (bool): Swap out the project's existing reports once the new
+            one is stored, instead of keeping them.
+    """
+    file_context = get_project_file_context(project, inline=True)
+
+    if not use_section_generation():
+        summary, all_questions = get_prompt_transcript(project)
+        project_info = get_project_info(project)
+        generated_report = anthropic_prompt.generate_requirements(all_questions, project_info, file_context=file_context, summary=summary)
+        with transaction.atomic():
+            report = Project_Report.objects.create(project=project, report=generated_report)
+            if replace:
+                Project_Report.objects.filter(project=project).exclude(id=report.id).delete()
+            record_report_version(project.id, report.report)
+        return report
+
+    section_prompts = build_section_prompts(project, file_context)
+    fragments = anthropic_prompt.generate_sections(_section_model_inputs(section_prompts))
+    return save_report_sections(project, section_prompts, fragments, replace=replace)
+
+
+def stream_project_report(project):
+    """
+    Generates the project's report like generate_project_report, streaming
+    it as it is produced.
+
+    Yields:
+        tuple: ("delta", str) for each chunk of report HTML, then
+            ("done", Project_Report) once the report has been stored.
+
+    Runs in the request, so it only reads the extracted file: raises
+    FileExtractionPending while the file is being extracted (the queued
+    report job waits for it instead).
+    """
+    file_context = get_project_file_context(project)
+
+    if not use_section_generation():
+        summary, all_questions = get_prompt_transcript(project)
+        project_info = get_project_info(project)
+        chunks = []
+        for chunk in anthropic_prompt.stream_requirements(all_questions, project_info, file_context=file_context, summary=summary):
+            chunks.append(chunk)
+            yield "delta", chunk
+        with transaction.atomic():
+            report = Project_Report.objects.create(project=project, report="".join(chunks))
+            record_report_version(project.id, report.report)
+        yield "done", report
+        return
+
+    section_prompts = build_section_prompts(project, file_context)
+    yield "delta", report_document_head(get_project_info(project))
+    fragments = {}
+    for key, fragment in anthropic_prompt.iter_sections(_section_model_inputs(section_prompts)):
+        fragments[key] = fragment
+        if fragment:
+            yield "delta", fragment + "\n"
+    yield "delta", REPORT_DOCUMENT_TAIL
+    yield "done", save_report_sections(project, section_prompts, fragments)
+
+
+def regenerate_project_report(project):
+    """
+    Regenerates the project's latest report after its answers changed.
+
+    Sections whose prompt is unchanged (same routed answers, project info,
+    file and custom prompt) are kept as they are; only the affected sections
+    are sent to the model. Reports without stored sections (generated in
+    single mode or before sections existed) are regenerated in full.
+
+    The current report keeps being served until the new one is stored, which
+    happens atomically; if generation fails it is left untouched.
+    Regenerations of the same project are serialized by a project lock.
+
+    Returns:
+        tuple: (Project_Report, {section key: diff_answer_basis result}) for
+            the regenerated sections.
+    """
+    with project_lock(
+        project.id,
+        "report_regeneration",
+        timeout=settings.REPORT_REGENERATION_LOCK_TIMEOUT,
+        blocking_timeout=settings.REPORT_REGENERATION_LOCK_TIMEOUT
+    ):
+        return _regenerate_project_report(project)
+
+
+def _regenerate_project_report(project):
+    report = Project_Report.objects.filter(project=project).order_by("-created_at").first()
+    existing = {section.key: section for section in report.sections.all()} if report else {}
+
+    if not use_section_generation() or not existing:
+        new_report = generate_project_report(project, replace=True)
+        changes = {section.key: diff_answer_basis({}, section.answer_basis) for section in new_report.sections.all()}
+        return new_report, changes
+
+    file_context = get_project_file_context(project, inline=True)
+    section_prompts = build_section_prompts(project, file_context)
+    stale = {
+        key: section for key, section in section_prompts.items()
+        if key not in existing or existing[key].prompt_hash != section["prompt_hash"]
+    }
+    changes = {
+        key: diff_answer_basis(existing[key].answer_basis if key in existing else {}, section["answer_basis"])
+        for key, section in stale.items()
+    }
+    if not stale:
+        return report, changes
+
+    fragments = anthropic_prompt.generate_sections(_section_model_inputs(stale))
+    return save_report_sections(project, section_prompts, fragments, report=report), changes
+
+
+def active_report_jobs():
+    """
+    Report jobs that are queued or running, leaving out those not updated
+    for REPORT_JOB_STALE_SECONDS, whose worker or broker message was lost.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+    return Report_Job.objects.filter(status__in=["queued", "running"], updated_at__gte=stale_before)
+
+
+def fail_stale_report_jobs(**filters):
+    """Marks the lost queued or running report jobs matching filters as failed."""
+    stale_before = timezone.now() - timedelta(seconds=settings.REPORT_JOB_STALE_SECONDS)
+    Report_Job.objects.filter(status__in=["queued", "running"], updated_at__lt=stale_before, **filters).update(
+        status="failed", error="Report job did not finish in time.", updated_at=timezone.now()
+    )
+
+
+def regeneration_pending(project_id):
+    """Whether a newer version of the project's report is being generated."""
+    return active_report_jobs().filter(project_id=project_id, kind="regenerate").exists()
+
+
+def annotate_regeneration_pending(queryset):
+    """
+    Annotates rows of a model with a project (reports, report jobs) with
+    regeneration_pending, so serializing them doesn't query per row.
+    """
+    return queryset.annotate(regeneration_pending=Exists(
+        active_report_jobs().filter(project=OuterRef("project_id"), kind="regenerate")
+    ))
+
+
+def queue_report_job(project, kind="generate"):
+    """
+    Queues a background report (re)generation and returns its Report_Job.
+
+    A generation already in progress is reused. A queued regeneration is
+    reused too, but a running one is not, since it may have read the answers
+    before the latest change. Lost jobs (see active_report_jobs) are marked
+    failed rather than reused.
+
+    If the job can't be queued it is returned marked as failed.
+    """
+    fail_stale_report_jobs(project=project, kind=kind)
+    reusable_statuses = ["queued", "running"] if kind == "generate" else ["queued"]
+    report_job = active_report_jobs().filter(project=project, kind=kind, status__in=reusable_statuses).first()
+    if report_job:
+        return report_job
+
+    from ..tasks import generate_report_task
+    report_job = Report_Job.objects.create(project=project, kind=kind)
+    try:
+        result = generate_report_task.delay(report_job.id)
+    except Exception as e:
+        print(f"Error queueing report {kind}: {e}")
+        report_job.status = "failed"
+        report_job.error = f"Report {kind} could not be queued."
+        report_job.save(update_fields=["status", "error", "updated_at"])
+        return report_job
+
+    report_job.task_id = result.id or ""
+    report_job.save(update_fields=["task_id", "updated_at"])
+    return report_job
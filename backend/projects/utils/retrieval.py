@@ -0,0 +1,136 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+
+from ..anthropic.prompt_builder import count_tokens
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in into is it its
+me my no not of on or our so that the their them then there these they this to was
+we were what when where which who will with would you your
+""".split())
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def chunk_document(text, pages=None, chunk_chars=None, overlap=None):
+    """
+    Splits a document into overlapping chunks, preferring paragraph and
+    sentence boundaries.
+
+    Returns:
+        list: [{"start": int, "end": int, "page": int or None}] offsets into text.
+    """
+    chunk_chars = chunk_chars or settings.FILE_CONTEXT_CHUNK_CHARS
+    overlap = settings.FILE_CONTEXT_CHUNK_OVERLAP if overlap is None else overlap
+    pages = pages or []
+
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_chars, length)
+        if end < length:
+            # Break at the last paragraph / line / sentence end in the second half of the window
+            window = text[start + chunk_chars // 2:end]
+            for separator in ("\n\n", "\n", ". "):
+                position = window.rfind(separator)
+                if position != -1:
+                    end = start + chunk_chars // 2 + position + len(separator)
+                    break
+
+        page = None
+        for page_offsets in pages:
+            if page_offsets["start"] <= start < page_offsets["end"] + 1:
+                page = page_offsets["page"]
+                break
+
+        chunks.append({"start": start, "end": end, "page": page})
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def build_index(text, pages=None):
+    """
+    Builds a BM25 index over the chunks of a document. The index only holds
+    offsets and term statistics so it can be stored as JSON next to the text.
+    """
+    chunks = chunk_document(text, pages)
+    term_frequencies = []
+    document_frequencies = Counter()
+    for chunk in chunks:
+        tf = Counter(tokenize(text[chunk["start"]:chunk["end"]]))
+        term_frequencies.append(dict(tf))
+        document_frequencies.update(tf.keys())
+
+    lengths = [sum(tf.values()) for tf in term_frequencies]
+    return {
+        "chunks": chunks,
+        "tf": term_frequencies,
+        "df": dict(document_frequencies),
+        "avgdl": (sum(lengths) / len(lengths)) if lengths else 0
+    }
+
+
+def bm25_scores(index, query, k1=1.5, b=0.75):
+    query_terms = set(tokenize(query))
+    chunk_count = len(index["chunks"])
+    avgdl = index["avgdl"] or 1
+
+    scores = []
+    for tf in index["tf"]:
+        length = sum(tf.values())
+        score = 0.0
+        for term in query_terms:
+            frequency = tf.get(term)
+            if not frequency:
+                continue
+            df = index["df"].get(term, 0)
+            idf = math.log(1 + (chunk_count - df + 0.5) / (df + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / avgdl))
+        scores.append(score)
+    return scores
+
+
+def select_excerpts(text, query, index=None, pages=None, token_budget=None, top_k=None):
+    """
+    Returns the parts of a document most relevant to the query within a
+    token budget. Documents that fit the budget are returned whole.
+
+    The top_k chunks by BM25 score are taken while they fit, then put back in
+    document order and labelled with their page.
+    """
+    token_budget = token_budget or settings.FILE_CONTEXT_TOKEN_BUDGET
+    top_k = top_k or settings.FILE_CONTEXT_TOP_K
+
+    if count_tokens(text) <= token_budget:
+        return text
+
+    index = index or build_index(text, pages)
+    scores = bm25_scores(index, query)
+    ranked = sorted(range(len(scores)), key=lambda position: (-scores[position], position))
+
+    selected = []
+    used_tokens = 0
+    for position in ranked[:top_k]:
+        chunk = index["chunks"][position]
+        tokens = count_tokens(text[chunk["start"]:chunk["end"]])
+        if used_tokens + tokens > token_budget:
+            continue
+        selected.append(chunk)
+        used_tokens += tokens
+
+    excerpts = []
+    for chunk in sorted(selected, key=lambda chunk: chunk["start"]):
+        label = f"[Excerpt, page {chunk['page']}]" if chunk["page"] else "[Excerpt]"
+        excerpts.append(f"{label}\n{text[chunk['start']:chunk['end']].strip()}")
+    return "\n\n".join(excerpts)
@@ -1,4 +1,9 @@
+import json
+from django.conf import settings
 from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import status
 from django.contrib.auth import  get_user_model
 from rest_framework.views import APIView
@@ -6,11 +11,19 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
-from .models import ProjectType, Project, Question, Answer, AI_Question, AI_Answer, Project_Report
-from .serializers import QuestionSerializer, AnswerSerializer, ProjectTypeSerializer, ProjectSerializer, AI_QuestionSerializer, AI_AnswerSerializer, Project_ReportSerializer
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from .models import ProjectType, Project, Question, Answer, AI_Question, AI_Answer, Project_Report, Report_Section, Report_Version, Report_Job
+from .serializers import QuestionSerializer, AnswerSerializer, ProjectTypeSerializer, ProjectSerializer, AI_QuestionSerializer, AI_AnswerSerializer, Project_ReportSerializer, Report_SectionSerializer, Report_VersionSerializer, Report_JobSerializer
 from django.db.models import Q
 from .anthropic.prompt import anthropic_prompt
-from .utils.file_parser import get_file_content_as_context
+from .utils.file_context import hash_file, queue_file_extraction, FileExtractionPending
+from .utils.questionnaire import ensure_ai_questions, should_prefetch_ai_questions, queue_transcript_summary, invalidate_transcript_summary
+from .utils.locks import LockTimeout
+from .utils.reports import annotate_regeneration_pending, fail_stale_report_jobs, stream_project_report, queue_report_job
+from .utils.report_versions import get_report_version_text, diff_report_versions
+from .utils.pagination import paginate
+from .utils.progress import progress_update, refresh_progress, refresh_project_type_progress, get_progress_project, get_progress, get_questionnaire_project, get_questionnaire_validators
+from .tasks import prefetch_ai_questions_task
 
 
 # Create your views here.
@@ -86,14 +99,23 @@ class ProjectView(APIView):
         except ProjectType.DoesNotExist:
             return Response({"detail": "Project type is not present"}, status=status.HTTP_400_BAD_REQUEST)
 
+        uploaded_file = request.FILES.get('file')
+
         project = Project.objects.create(
             name = name, 
             description = description, 
             project_type = project_type, 
             industry_type = industry_type,
             user = user, 
-            file = request.FILES.get('file')
+            file = uploaded_file,
+            file_hash = hash_file(uploaded_file) if uploaded_file else ""
         )
+        refresh_progress(Project.objects.filter(pk=project.pk))
+
+        # Parse the upload in the background so questionnaire steps only read the result
+        if uploaded_file:
+            queue_file_extraction(project)
+
         serializer = ProjectSerializer(project)
         return Response({
             "detail": "Project Created successfully",
@@ -112,7 +134,7 @@ class ProjectView(APIView):
         project = Project.objects.filter(
             Q(name__icontains=query) |
             Q(description__icontains=query)
-        ).filter(enabled = enabled)
+        ).filter(enabled = enabled).select_related("file_context")
 
         if project_type_id:
             project_type = ProjectType.objects.filter(id = project_type_id)
@@ -124,11 +146,14 @@ class ProjectView(APIView):
         if user.role != 'admin':
             project = project.filter(user = user)
         
+        project, next_cursor, count = paginate(request, project, ("-created_at", "id"))
         project_data = ProjectSerializer(project, many = True)
 
         return Response({
             "detail": "Project list retrieved successfully",
-            "data": project_data.data
+            "data": project_data.data,
+            "next": next_cursor,
+            "count": count
         }, status=status.HTTP_200_OK)
 
 
@@ -139,7 +164,7 @@ class GetOneProjectView(APIView):
     def get(self, request, project_id):
         print("project_id: ", project_id)
         user = request.user
-        project = Project.objects.get(id = project_id)
+        project = Project.objects.select_related("file_context").get(id = project_id)
 
         if not project:
             return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
@@ -195,6 +220,7 @@ class QuestionView(APIView):
             description = description,
             question_type = question_type
         )
+        refresh_project_type_progress(project_type)
 
         return Response({
             "detail": "Question Created successfully",
@@ -252,6 +278,7 @@ class RemoveQuestionView(APIView):
         
         question.enabled = False
         question.save()
+        refresh_project_type_progress(question.project_type_id)
 
         return Response({
             "detail": "Question removed successfully"
@@ -277,12 +304,14 @@ class AnswerView(APIView):
         if not project:
             return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
         
-        answer = Answer.objects.create(
-            user = user,
-            question = question,
-            project = project,
-            text = text
-        )
+        with progress_update(project):
+            answer = Answer.objects.create(
+                user = user,
+                question = question,
+                project = project,
+                text = text
+            )
+        queue_transcript_summary(project)
 
         return Response({
             "detail": "Answer Created successfully",
@@ -344,7 +373,9 @@ class RemoveAnswerView(APIView):
         if user.role != "admin" and user != project.user:
             return Response({"detail": "User is not authorized to remove this answer."}, status=status.HTTP_400_BAD_REQUEST)
         
-        answer.delete()
+        with progress_update(project):
+            answer.delete()
+        invalidate_transcript_summary(project)
 
         return Response({
             "detail": "Answer removed successfully"
@@ -358,118 +389,86 @@ class GetNextQuestionView(APIView):
     def get(self, request, project_id):
         user = request.user
 
-        project = Project.objects.get(id = project_id)
+        # Progress and the next pending question are kept on the project
+        project = get_progress_project(project_id)
 
         if not project:
             return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
         
         if user.role != "admin" and user != project.user:
             return Response({"detail": "User is not authorized to view questions for this project."}, status=status.HTTP_400_BAD_REQUEST)
-        
-        answered_question_ids = Answer.objects.filter(project=project).values_list('question_id', flat=True)
-        
-        predefined_total = Question.objects.filter(project_type=project.project_type, enabled=True).count()
-        ai_total = AI_Question.objects.filter(project=project).count()
-        total_questions = predefined_total + ai_total
-        
-        answered_predefined = Answer.objects.filter(project=project).count()
-        answered_ai = AI_Answer.objects.filter(ai_question__project=project).count()
-        current_question_index = answered_predefined + answered_ai + 1
-
-        next_question = Question.objects.filter(
-            project_type=project.project_type,
-            enabled=True
-        ).exclude(id__in=answered_question_ids).order_by("question_no").first()
 
-        if next_question:
-            serializer = QuestionSerializer(next_question)
+        if project.next_question:
+            serializer = QuestionSerializer(project.next_question)
             return Response({
                 "detail": "Next question retrieved successfully",
                 "data": {
                     **serializer.data,
                     "question_type": "predefined",
-                    "total_questions": total_questions,
-                    "current_question_index": current_question_index
+                    **get_progress(project)
                 }
             }, status=status.HTTP_200_OK)
-        
-        ai_answered_question_ids = AI_Answer.objects.filter(ai_question__project=project).values_list('ai_question__id', flat=True)
-        
-        print("AI answered questions: ", ai_answered_question_ids)
-        next_ai_question = AI_Question.objects.filter(
-            project=project
-        ).exclude(id__in=ai_answered_question_ids).order_by("question_no").first()
-        print("Next AI Question: ", next_ai_question)
-        if next_ai_question:
-            serializer = AI_QuestionSerializer(next_ai_question)
+
+        # Generate the AI questions (or refresh a stale prefetched batch) before any is answered
+        if not project.ai_answered:
+            try:
+                ensure_ai_questions(project)
+            except LockTimeout:
+                return Response({"detail": "AI questions are still being generated. Please try again."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except FileExtractionPending:
+                return Response({"detail": "The uploaded file is still being processed. Please try again shortly."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            # This or a concurrent request may have (re)generated them
+            project = get_progress_project(project_id)
+
+        if project.next_ai_question:
+            serializer = AI_QuestionSerializer(project.next_ai_question)
             return Response({
                 "detail": "Next AI question retrieved successfully",
                 "data": {
                     **serializer.data,
                     "question_type": "ai",
-                    "total_questions": total_questions,
-                    "current_question_index": current_question_index
+                    **get_progress(project)
                 }
             }, status=status.HTTP_200_OK)
         
-        print("AI answered questions: ", ai_answered_question_ids)
-        
-        if ai_answered_question_ids.count() != 0:
-            return Response({"detail": "All questions have been answered."}, status=status.HTTP_200_OK)
-        
-        # Generate new question using Anthropic model
-        all_questions = []
-        answers = Answer.objects.filter(project=project)
-        for answer in answers:
-            all_questions.append({
-                "id": answer.question.id,
-                "question_text": answer.question.text,
-                "answer_text": answer.text,
-                "question_asked_by": "predefined"  # Assuming all these questions were asked by the user
-            })
-
-        project_info = {
-            "project_name": project.name,
-            "project_description": project.description,
-            "project_type": project.project_type.name,
-            "project_type_description": project.project_type.description
-        }
+        return Response({"detail": "All questions have been answered."}, status=status.HTTP_200_OK)
 
-        file_context = get_file_content_as_context(project.file)
-        ai_questions = anthropic_prompt.ask_questions(all_questions, project_info, file_context=file_context)
 
-        print("Generated AI Questions: ", ai_questions)
+def get_next_question_after_answers(project, answered_predefined):
+    """
+    Returns (project, next question data or None) once answers have been
+    saved, with the project re-read for its updated progress.
 
-        if not ai_questions:
-            return Response({"detail": "All questions have been answered."}, status=status.HTTP_200_OK)
-        
-        ques_no = 1
-        previous_ai_question=None
-        for ai_question_text in ai_questions:
-            ai_question = AI_Question.objects.create(
-                project=project,
-                text=ai_question_text,
-                question_no = ques_no
-            )
-            ques_no += 1
-            if previous_ai_question:
-                previous_ai_question.next_question = ai_question
-                previous_ai_question.save()
-            previous_ai_question = ai_question
-        
-        ai_total = AI_Question.objects.filter(project=project).count()
-        total_questions = predefined_total + ai_total
-        
-        ai_ques = AI_Question.objects.filter(project=project).order_by("question_no").first()
-        serializer = AI_QuestionSerializer(ai_ques)
-        return Response({
-            "detail": "Next AI question generated successfully",
-            "data": {
-            **serializer.data,
-            "question_type": "ai",
-            "total_questions": total_questions,
-            "current_question_index": current_question_index
-        }}, status=status.HTTP_200_OK)
+    After predefined answers the AI questions are prefetched in the
+    background when the end of the predefined questions is near, and
+    generated on the spot once they have all been answered. Raises
+    LockTimeout if another request is still generating them, and
+    FileExtractionPending if they are waiting on the uploaded file.
+    """
+    project = get_progress_project(project.id)
+
+    if project.next_question:
+        if answered_predefined and should_prefetch_ai_questions(project):
+            try:
+                prefetch_ai_questions_task.delay(project.id)
+            except Exception as e:
+                # Not fatal: the questions are generated on demand instead
+                print(f"Error queueing AI question prefetch: {e}")
+        return project, {
+            **QuestionSerializer(project.next_question).data,
+            "question_type": "predefined"
+        }
+
+    if answered_predefined:
+        ensure_ai_questions(project)
+        project = get_progress_project(project.id)
+
+    if project.next_ai_question:
+        return project, {
+            **AI_QuestionSerializer(project.next_ai_question).data,
+            "question_type": "ai"
+        }
+    return project, None
 
 
 class AnswerQuestionView(APIView):
@@ -489,101 +488,218 @@ class AnswerQuestionView(APIView):
         if user.role != "admin" and user != project.user:
             return Response({"detail": "User is not authorized to answer questions for this project."}, status=status.HTTP_403_FORBIDDEN)
 
-        next_question = None
-        answer = None
-        answer_data = None
-
         if question_type == "predefined":
             question = Question.objects.get(id = question_id)
 
-            answer = Answer.objects.create(
-                user = user,
-                question = question,
-                project = project,
-                text = text
-            )
-
+            with progress_update(project):
+                answer = Answer.objects.create(
+                    user = user,
+                    question = question,
+                    project = project,
+                    text = text
+                )
             answer_data = AnswerSerializer(answer).data
-
-            if question.next_question:
-                next_question = {
-                    **QuestionSerializer(question.next_question).data,
-                    "question_type": "predefined"
-                }
-            else:
-                all_questions = []
-                answers = Answer.objects.filter(project=project)
-                for ans in answers:
-                    all_questions.append({
-                        "id": ans.question.id,
-                        "question_text": ans.question.text,
-                        "answer_text": ans.text,
-                        "question_asked_by": "predefined"  # Assuming all these questions were asked by the user
-                    })
-
-                project_info = {
-                    "project_name": project.name,
-                    "project_description": project.description,
-                    "project_type": project.project_type.name,
-                    "project_type_description": project.project_type.description
-                }
-                file_context = get_file_content_as_context(project.file)
-                ai_questions = anthropic_prompt.ask_questions(all_questions, project_info, file_context=file_context)
-
-                if ai_questions:
-                    previous_ai_question = None
-                    ques_no = 0
-                    for ai_question_text in ai_questions:
-                        ai_question = AI_Question.objects.create(
-                            project=project,
-                            text=ai_question_text,
-                            question_no = ques_no
-                        )
-                        ques_no += 1
-                        if previous_ai_question:
-                            previous_ai_question.next_question = ai_question
-                            previous_ai_question.save()
-                        previous_ai_question = ai_question
-                    next_question = {
-                        **AI_QuestionSerializer(AI_Question.objects.filter(project__id=project_id).order_by("question_no").first()).data,
-                        "question_type": "ai"
-                    }
         
         else:
             question = AI_Question.objects.get(id = question_id)
 
-            print("Question: ", question)
-
-            answer = AI_Answer.objects.create(
-                user = user,
-                ai_question = question,
-                text = text
-            )
-
+            with progress_update(project):
+                answer = AI_Answer.objects.create(
+                    user = user,
+                    ai_question = question,
+                    text = text
+                )
             answer_data = AI_AnswerSerializer(answer).data
 
-            if question.next_question:
-                next_question = {
-                    **AI_QuestionSerializer(question.next_question).data,
-                    "question_type": "ai"
-                }
+        queue_transcript_summary(project)
 
-        predefined_total = Question.objects.filter(project_type=project.project_type, enabled=True).count()
-        ai_total = AI_Question.objects.filter(project=project).count()
-        total_questions = predefined_total + ai_total
-        
-        answered_predefined = Answer.objects.filter(project=project).count()
-        answered_ai = AI_Answer.objects.filter(ai_question__project=project).count()
-        current_question_index = answered_predefined + answered_ai + (1 if next_question else 0)
+        try:
+            project, next_question = get_next_question_after_answers(project, answered_predefined=question_type == "predefined")
+        except LockTimeout:
+            return Response({
+                "detail": "Answer Created successfully. AI questions are still being generated, please fetch the next question again.",
+                "data": answer_data,
+                "next_question": None,
+                "progress": None
+            }, status = status.HTTP_201_CREATED)
+        except FileExtractionPending:
+            return Response({
+                "detail": "Answer Created successfully. The uploaded file is still being processed, please fetch the next question again shortly.",
+                "data": answer_data,
+                "next_question": None,
+                "progress": None
+            }, status = status.HTTP_201_CREATED)
 
         return Response({
             "detail": "Answer Created successfully",
             "data": answer_data,
             "next_question": next_question,
-            "progress": {
-                "total_questions": total_questions,
-                "current_question_index": current_question_index
-            } if next_question else None
+            "progress": get_progress(project) if next_question else None
+        }, status = status.HTTP_201_CREATED)
+
+
+class QuestionnaireView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def get(self, request, project_id):
+        """
+        Returns everything needed to show or resume a project's questionnaire
+        in one payload: the project, its ordered predefined and AI questions,
+        the answers given so far, the next question and progress.
+
+        Supports conditional requests (ETag / Last-Modified), answering 304
+        before anything but the project row has been read.
+        """
+        user = request.user
+
+        project = get_questionnaire_project(project_id)
+
+        if not project:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to view this project."}, status=status.HTTP_400_BAD_REQUEST)
+
+        etag, last_modified = get_questionnaire_validators(project)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        questions = Question.objects.filter(project_type=project.project_type, enabled=True).order_by("question_no")
+        ai_questions = AI_Question.objects.filter(project=project).order_by("question_no")
+        answers = Answer.objects.filter(project=project).order_by("created_at", "id")
+        ai_answers = AI_Answer.objects.filter(ai_question__project=project).order_by("created_at", "id")
+
+        next_question = None
+        if project.next_question:
+            next_question = {**QuestionSerializer(project.next_question).data, "question_type": "predefined"}
+        elif project.next_ai_question:
+            next_question = {**AI_QuestionSerializer(project.next_ai_question).data, "question_type": "ai"}
+
+        response = Response({
+            "detail": "Questionnaire retrieved successfully",
+            "data": {
+                "project": ProjectSerializer(project).data,
+                "questions": QuestionSerializer(questions, many=True).data,
+                "ai_questions": AI_QuestionSerializer(ai_questions, many=True).data,
+                "answers": AnswerSerializer(answers, many=True).data,
+                "ai_answers": AI_AnswerSerializer(ai_answers, many=True).data,
+                "next_question": next_question,
+                "progress": {
+                    **get_progress(project, has_next_question=next_question is not None),
+                    "answered_questions": project.predefined_answered + project.ai_answered
+                },
+                # AI questions are generated once the predefined ones are answered
+                "complete": next_question is None and project.ai_question_total > 0
+            }
+        }, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
+def is_id(value):
+    # bool is an int subclass, but True isn't an id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class BatchAnswerView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def post(self, request):
+        """
+        Saves several answers to a project's questions at once.
+
+        Expects: { "project_id": 1, "answers": [{"question_id": 3, "question_type": "predefined" or "ai", "text": "..."}] }
+        The answers are validated together and either all saved or none.
+        """
+        user = request.user
+
+        project_id, entries = request.data.get("project_id"), request.data.get("answers")
+
+        if not isinstance(entries, list) or not entries:
+            return Response({"detail": "A non-empty list of answers is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(entries) > settings.ANSWER_BATCH_MAX_SIZE:
+            return Response({"detail": f"At most {settings.ANSWER_BATCH_MAX_SIZE} answers can be submitted at once."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not is_id(project_id):
+            return Response({"detail": "An integer project_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        project = Project.objects.filter(id = project_id).first()
+
+        if not project:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to answer questions for this project."}, status=status.HTTP_403_FORBIDDEN)
+
+        errors = {}
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict) or entry.get("question_type") not in ("predefined", "ai") or not is_id(entry.get("question_id")) or not isinstance(entry.get("text"), str):
+                errors[index] = "Each answer needs an integer question_id, a question_type of 'predefined' or 'ai', and a text."
+
+        if errors:
+            return Response({"detail": "Invalid answers.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        # One query per question kind, limited to this project's questions
+        questions = Question.objects.in_bulk([entry["question_id"] for entry in entries if entry["question_type"] == "predefined"])
+        ai_questions = AI_Question.objects.filter(project=project).in_bulk([entry["question_id"] for entry in entries if entry["question_type"] == "ai"])
+
+        answers, ai_answers = [], []
+        for index, entry in enumerate(entries):
+            if entry["question_type"] == "predefined":
+                question = questions.get(entry["question_id"])
+                if not question or question.project_type_id != project.project_type_id or not question.enabled:
+                    errors[index] = "Question is not present"
+                    continue
+                answers.append(Answer(user = user, question = question, project = project, text = entry["text"]))
+            else:
+                ai_question = ai_questions.get(entry["question_id"])
+                if not ai_question:
+                    errors[index] = "Question is not present"
+                    continue
+                ai_answers.append(AI_Answer(user = user, ai_question = ai_question, text = entry["text"]))
+
+        if errors:
+            return Response({"detail": "Invalid answers.", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with progress_update(project):
+            Answer.objects.bulk_create(answers)
+            AI_Answer.objects.bulk_create(ai_answers)
+
+        queue_transcript_summary(project)
+
+        answer_data = {
+            "predefined": AnswerSerializer(answers, many=True).data,
+            "ai": AI_AnswerSerializer(ai_answers, many=True).data
+        }
+
+        try:
+            project, next_question = get_next_question_after_answers(project, answered_predefined=bool(answers))
+        except LockTimeout:
+            return Response({
+                "detail": "Answers Created successfully. AI questions are still being generated, please fetch the next question again.",
+                "data": answer_data,
+                "next_question": None,
+                "progress": None
+            }, status = status.HTTP_201_CREATED)
+        except FileExtractionPending:
+            return Response({
+                "detail": "Answers Created successfully. The uploaded file is still being processed, please fetch the next question again shortly.",
+                "data": answer_data,
+                "next_question": None,
+                "progress": None
+            }, status = status.HTTP_201_CREATED)
+
+        return Response({
+            "detail": "Answers Created successfully",
+            "data": answer_data,
+            "next_question": next_question,
+            "progress": get_progress(project) if next_question else None
         }, status = status.HTTP_201_CREATED)
 
 
@@ -602,53 +718,218 @@ class GenerateReportView(APIView):
         if user.role != "admin" and user != project.user:
             return Response({"detail": "User is not authorized to generate report for this project."}, status=status.HTTP_403_FORBIDDEN)
 
-        print("project: ", project)
-        project_report = Project_Report.objects.filter(project=project).first()
+        project_report = annotate_regeneration_pending(Project_Report.objects.filter(project=project)).first()
 
         if project_report:
             return Response({
                 "detail": "Project Report",
                 "data": Project_ReportSerializer(project_report).data
             }, status = status.HTTP_200_OK)
-        
-        all_questions = []
-
-        answers = Answer.objects.filter(project=project)
-        for answer in answers:
-            all_questions.append({
-                "id": answer.question.id,
-                "question_text": answer.question.text,
-                "answer_text": answer.text,
-                "question_asked_by": "predefined"  # Assuming all these questions were asked by the user
-            })
-        
-        ai_answers = AI_Answer.objects.filter(ai_question__project=project)
-        for answer in ai_answers:
-            all_questions.append({
-                "id": answer.ai_question.question_no,
-                "question_text": answer.ai_question.text,
-                "answer_text": answer.text,
-                "question_asked_by": "ai"  # Assuming all these questions were asked by the user
-            })
-
-        project_info = {
-            "project_name": project.name,
-            "project_description": project.description,
-            "project_type": project.project_type.name,
-            "project_type_description": project.project_type.description
-        }
 
-        file_context = get_file_content_as_context(project.file)
-        generated_report = anthropic_prompt.generate_requirements(all_questions, project_info, file_context=file_context)
+        # Reuses the job that is already generating this project's report
+        report_job = queue_report_job(project)
 
-        print("Generated Report: ", generated_report)
+        if report_job.status == "failed":
+            return Response({
+                "detail": "Report generation is unavailable, please try again later.",
+                "data": Report_JobSerializer(report_job).data
+            }, status = status.HTTP_503_SERVICE_UNAVAILABLE)
 
-        project_report = Project_Report.objects.create(project = project, report = generated_report)
+        return Response({
+            "detail": "Project Report generation queued",
+            "data": Report_JobSerializer(report_job).data
+        }, status = status.HTTP_202_ACCEPTED)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients that send `Accept: text/event-stream` (EventSource) through content negotiation.
+    """
+    media_type = "text/event-stream"
+    format = "event-stream"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event(data, event="error")
+
+
+def sse_event(data, event=None):
+    """
+    Formats a Server-Sent Event; data is sent as JSON so HTML newlines are kept intact.
+    """
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+class StreamReportView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, project_id):
+        user = request.user
+
+        try:
+            project = Project.objects.select_related("project_type").get(id=project_id)
+        except Project.DoesNotExist:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to generate report for this project."}, status=status.HTTP_403_FORBIDDEN)
+
+        project_report = annotate_regeneration_pending(Project_Report.objects.filter(project=project)).first()
+
+        def event_stream():
+            if project_report:
+                yield sse_event({"delta": project_report.report})
+                yield sse_event(Project_ReportSerializer(project_report).data, event="done")
+                return
+
+            report = None
+            try:
+                for kind, value in stream_project_report(project):
+                    if kind == "delta":
+                        yield sse_event({"delta": value})
+                    else:
+                        report = value
+            except FileExtractionPending:
+                # The client falls back to the report job, which waits for the file
+                yield sse_event({"detail": "The uploaded file is still being processed."}, event="error")
+                return
+            except Exception as e:
+                print(f"Error streaming report for project {project.id}: {e}")
+                yield sse_event({"detail": "Report generation failed."}, event="error")
+                return
+
+            yield sse_event(Project_ReportSerializer(report).data, event="done")
+
+        response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class ReportJobView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def get(self, request, job_id):
+        user = request.user
+
+        # A lost job is reported as failed, so the client stops polling it
+        fail_stale_report_jobs(id=job_id)
+        try:
+            report_job = annotate_regeneration_pending(Report_Job.objects.select_related("project", "report")).get(id=job_id)
+        except Report_Job.DoesNotExist:
+            return Response({"detail": "Report job is not present"}, status=status.HTTP_404_NOT_FOUND)
+
+        if report_job.report:
+            # The report is of the job's project, so it shares the annotation
+            report_job.report.regeneration_pending = report_job.regeneration_pending
+
+        if user.role != "admin" and user != report_job.project.user:
+            return Response({"detail": "User is not authorized to view this report job."}, status=status.HTTP_403_FORBIDDEN)
 
         return Response({
-            "detail": "Project Report Generated",
-            "data": Project_ReportSerializer(project_report).data
-        }, status = status.HTTP_201_CREATED)
-        
+            "detail": f"Report job is {report_job.status}",
+            "data": Report_JobSerializer(report_job).data
+        }, status = status.HTTP_200_OK)
+
+
+class ReportSectionView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
 
+    def get(self, request, project_id, key=None):
+        user = request.user
+
+        try:
+            project = Project.objects.get(id=project_id)
+        except Project.DoesNotExist:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to view the report for this project."}, status=status.HTTP_403_FORBIDDEN)
+
+        project_report = Project_Report.objects.filter(project=project).order_by("-created_at").first()
+        if not project_report:
+            return Response({"detail": "Report is not present"}, status=status.HTTP_404_NOT_FOUND)
 
+        sections = Report_Section.objects.filter(report=project_report)
+        if key:
+            section = sections.filter(key=key).first()
+            if not section:
+                return Response({"detail": "Report section is not present"}, status=status.HTTP_404_NOT_FOUND)
+            return Response({
+                "detail": "Report section retrieved successfully",
+                "data": Report_SectionSerializer(section).data
+            }, status=status.HTTP_200_OK)
+
+        return Response({
+            "detail": "Report sections retrieved successfully",
+            "data": Report_SectionSerializer(sections, many=True).data
+        }, status=status.HTTP_200_OK)
+
+
+class ReportVersionView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def get(self, request, project_id, version=None):
+        user = request.user
+
+        try:
+            project = Project.objects.get(id=project_id)
+        except Project.DoesNotExist:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to view the report for this project."}, status=status.HTTP_403_FORBIDDEN)
+
+        if version is None:
+            # Only the metadata; the stored data can be large
+            versions = Report_Version.objects.filter(project=project).defer("data")
+            return Response({
+                "detail": "Report versions retrieved successfully",
+                "data": Report_VersionSerializer(versions, many=True).data
+            }, status=status.HTTP_200_OK)
+
+        report_version = Report_Version.objects.filter(project=project, version=version).defer("data").first()
+        if not report_version:
+            return Response({"detail": "Report version is not present"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "detail": "Report version retrieved successfully",
+            "data": {
+                **Report_VersionSerializer(report_version).data,
+                "report": get_report_version_text(project.id, version)
+            }
+        }, status=status.HTTP_200_OK)
+
+
+class ReportVersionDiffView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [TokenAuthentication]
+
+    def get(self, request, project_id, from_version, to_version):
+        user = request.user
+
+        try:
+            project = Project.objects.get(id=project_id)
+        except Project.DoesNotExist:
+            return Response({"detail": "Project is not present"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if user.role != "admin" and user != project.user:
+            return Response({"detail": "User is not authorized to view the report for this project."}, status=status.HTTP_403_FORBIDDEN)
+
+        diff = diff_report_versions(project.id, from_version, to_version)
+        if diff is None:
+            return Response({"detail": "Report version is not present"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "detail": "Report version diff retrieved successfully",
+            "data": {
+                "from_version": from_version,
+                "to_version": to_version,
+                "diff": diff
+            }
+        }, status=status.HTTP_200_OK)
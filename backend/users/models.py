@@ -23,6 +23,10 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        # Admin user list ordering (see projects/utils/pagination.py)
+        indexes = [models.Index(fields=['-date_joined', 'id'])]
+
 
 class PendingRegistration(models.Model):
     """Temporary storage for signup data with OTP verification pending."""
@@ -17,6 +17,8 @@ const statusConfig = {
 export default function ProjectsPage() {
     const [isLoading, setIsLoading] = useState(true);
     const [projects, setProjects] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [projectTypes, setProjectTypes] = useState([]);
     const [searchQuery, setSearchQuery] = useState('');
     const [statusFilter, setStatusFilter] = useState('all');
@@ -32,20 +34,24 @@ export default function ProjectsPage() {
         }
     };
 
-    const fetchProjects = async () => {
-        setIsLoading(true);
+    // Without a cursor the list is reloaded from the first page
+    const fetchProjects = async (cursor = null) => {
+        cursor ? setIsLoadingMore(true) : setIsLoading(true);
         try {
             const params = {};
             if (searchQuery) params.search = searchQuery;
             if (statusFilter !== 'all') params.status = statusFilter;
             if (typeFilter !== 'all') params.project_type = typeFilter;
             if (reportFilter !== 'all') params.has_report = reportFilter === 'has' ? 'true' : 'false';
+            if (cursor) params.cursor = cursor;
             const response = await adminApi.getProjects(params);
-            setProjects(response.results || []);
+            const results = response.results || [];
+            setProjects((current) => (cursor ? [...current, ...results] : results));
+            setNextCursor(response.next || null);
         } catch (err) {
             console.error('Failed to fetch projects:', err);
         } finally {
-            setIsLoading(false);
+            cursor ? setIsLoadingMore(false) : setIsLoading(false);
         }
     };
 
@@ -205,13 +211,9 @@ export default function ProjectsPage() {
                         )}
                     </div>
                 )}
-                pagination={{
-                    from: 1,
-                    to: projects.length,
-                    total: projects.length,
-                    onPrevious: () => { },
-                    onNext: () => { },
-                }}
+                hasMore={!!nextCursor}
+                onLoadMore={() => fetchProjects(nextCursor)}
+                isLoadingMore={isLoadingMore}
                 emptyMessage="No projects found"
             />
         </div>
@@ -6,12 +6,14 @@ import { Button } from '@/components/ui/Button';
 import { Input } from '@/components/ui/Input';
 import { Badge } from '@/components/ui/Badge';
 import { Card, CardHeader, CardTitle, CardContent } from '@/components/ui/Card';
-import adminApi from '@/lib/adminApi';
+import adminApi, { fetchAllPages } from '@/lib/adminApi';
 
 export default function AIMonitorPage() {
     const [isLoading, setIsLoading] = useState(true);
     const [stats, setStats] = useState(null);
     const [aiQuestions, setAIQuestions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [projects, setProjects] = useState([]);
     const [projectFilter, setProjectFilter] = useState('all');
     const [statusFilter, setStatusFilter] = useState('all');
@@ -23,10 +25,10 @@ export default function AIMonitorPage() {
         try {
             const [statsRes, projectsRes] = await Promise.all([
                 adminApi.getDashboardStats(),
-                adminApi.getProjects()
+                fetchAllPages(adminApi.getProjects, { page_size: 200 })
             ]);
             setStats(statsRes);
-            setProjects(projectsRes.results || []);
+            setProjects(projectsRes);
         } catch (err) {
             console.error('Failed to fetch data:', err);
         } finally {
@@ -34,15 +36,22 @@ export default function AIMonitorPage() {
         }
     };
 
-    const fetchAIQuestions = async () => {
+    // Without a cursor the list is reloaded from the first page
+    const fetchAIQuestions = async (cursor = null) => {
+        if (cursor) setIsLoadingMore(true);
         try {
             const params = {};
             if (projectFilter !== 'all') params.project = projectFilter;
             if (statusFilter !== 'all') params.answered = statusFilter === 'answered' ? 'true' : 'false';
+            if (cursor) params.cursor = cursor;
             const response = await adminApi.getAIQuestions(params);
-            setAIQuestions(response.results || []);
+            const results = response.results || [];
+            setAIQuestions((current) => (cursor ? [...current, ...results] : results));
+            setNextCursor(response.next || null);
         } catch (err) {
             console.error('Failed to fetch AI questions:', err);
+        } finally {
+            if (cursor) setIsLoadingMore(false);
         }
     };
 
@@ -211,6 +220,9 @@ export default function AIMonitorPage() {
                         </svg>
                     </Button>
                 )}
+                hasMore={!!nextCursor}
+                onLoadMore={() => fetchAIQuestions(nextCursor)}
+                isLoadingMore={isLoadingMore}
                 emptyMessage="No AI questions found"
             />
 
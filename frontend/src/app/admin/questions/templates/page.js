@@ -7,7 +7,7 @@ import { Input } from '@/components/ui/Input';
 import { Textarea } from '@/components/ui/Textarea';
 import { Badge } from '@/components/ui/Badge';
 import { Card, CardContent } from '@/components/ui/Card';
-import adminApi from '@/lib/adminApi';
+import adminApi, { fetchAllPages } from '@/lib/adminApi';
 
 export default function QuestionTemplatesPage() {
     const [isLoading, setIsLoading] = useState(true);
@@ -36,8 +36,9 @@ export default function QuestionTemplatesPage() {
         if (!selectedProjectType) return;
         setIsLoading(true);
         try {
-            const response = await adminApi.getQuestions({ project_type: selectedProjectType });
-            setQuestions(response.results || []);
+            // Reordering needs every question of the type, not just the first page
+            const results = await fetchAllPages(adminApi.getQuestions, { project_type: selectedProjectType, page_size: 200 });
+            setQuestions(results);
         } catch (err) {
             console.error('Failed to fetch questions:', err);
         } finally {
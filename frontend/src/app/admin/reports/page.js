@@ -11,30 +11,30 @@ import adminApi from '@/lib/adminApi';
 export default function ReportsPage() {
     const [isLoading, setIsLoading] = useState(true);
     const [reports, setReports] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
     const [statusFilter, setStatusFilter] = useState('all');
     const [regenerating, setRegenerating] = useState(null);
     const [selectedReport, setSelectedReport] = useState(null);
     const [isPanelOpen, setIsPanelOpen] = useState(false);
 
-    const fetchReports = async () => {
-        setIsLoading(true);
+    // Without a cursor the list is reloaded from the first page
+    const fetchReports = async (cursor = null) => {
+        cursor ? setIsLoadingMore(true) : setIsLoading(true);
         try {
             const params = {};
             if (searchQuery) params.search = searchQuery;
+            if (statusFilter !== 'all') params.status = statusFilter;
+            if (cursor) params.cursor = cursor;
             const response = await adminApi.getReports(params);
-            let results = response.results || [];
-
-            // Client-side status filter
-            if (statusFilter !== 'all') {
-                results = results.filter(r => r.status === statusFilter);
-            }
-
-            setReports(results);
+            const results = response.results || [];
+            setReports((current) => (cursor ? [...current, ...results] : results));
+            setNextCursor(response.next || null);
         } catch (err) {
             console.error('Failed to fetch reports:', err);
         } finally {
-            setIsLoading(false);
+            cursor ? setIsLoadingMore(false) : setIsLoading(false);
         }
     };
 
@@ -72,9 +72,16 @@ export default function ReportsPage() {
         }
     };
 
-    const handleView = (report) => {
+    const handleView = async (report) => {
+        // The list only carries a preview; load the full report for the panel
         setSelectedReport(report);
         setIsPanelOpen(true);
+        try {
+            const fullReport = await adminApi.getReport(report.id);
+            setSelectedReport(fullReport);
+        } catch (err) {
+            console.error('Failed to fetch report:', err);
+        }
     };
 
     const handleClosePanel = () => {
@@ -104,9 +111,14 @@ export default function ReportsPage() {
         {
             header: 'Status',
             render: (row) => (
-                <Badge variant={row.status === 'ready' ? 'success' : 'warning'}>
-                    {row.status === 'ready' ? 'Ready' : 'Pending'}
-                </Badge>
+                <div className="flex items-center gap-2">
+                    <Badge variant={row.status === 'ready' ? 'success' : 'warning'}>
+                        {row.status === 'ready' ? 'Ready' : 'Pending'}
+                    </Badge>
+                    {row.regeneration_pending && (
+                        <Badge variant="warning">Updating</Badge>
+                    )}
+                </div>
             ),
         },
         {
@@ -250,6 +262,9 @@ export default function ReportsPage() {
                         )}
                     </div>
                 )}
+                hasMore={!!nextCursor}
+                onLoadMore={() => fetchReports(nextCursor)}
+                isLoadingMore={isLoadingMore}
                 emptyMessage="No reports found"
             />
 
@@ -292,7 +307,7 @@ export default function ReportsPage() {
                         <div>
                             <label className="block text-sm font-medium text-muted-foreground mb-2">Report Content</label>
                             <div className="p-4 bg-background border border-border rounded-lg max-h-[60vh] overflow-y-auto">
-                                <ReportViewer htmlContent={selectedReport.report} />
+                                <ReportViewer htmlContent={selectedReport.report ?? selectedReport.preview} />
                             </div>
                         </div>
 
@@ -10,6 +10,8 @@ import adminApi from '@/lib/adminApi';
 export default function UsersPage() {
     const [isLoading, setIsLoading] = useState(true);
     const [users, setUsers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [searchQuery, setSearchQuery] = useState('');
     const [roleFilter, setRoleFilter] = useState('all');
     const [selectedUser, setSelectedUser] = useState(null);
@@ -18,18 +20,22 @@ export default function UsersPage() {
     const [error, setError] = useState('');
     const [saving, setSaving] = useState(false);
 
-    const fetchUsers = async () => {
-        setIsLoading(true);
+    // Without a cursor the list is reloaded from the first page
+    const fetchUsers = async (cursor = null) => {
+        cursor ? setIsLoadingMore(true) : setIsLoading(true);
         try {
             const params = {};
             if (searchQuery) params.search = searchQuery;
             if (roleFilter !== 'all') params.role = roleFilter;
+            if (cursor) params.cursor = cursor;
             const response = await adminApi.getUsers(params);
-            setUsers(response.results || []);
+            const results = response.results || [];
+            setUsers((current) => (cursor ? [...current, ...results] : results));
+            setNextCursor(response.next || null);
         } catch (err) {
             console.error('Failed to fetch users:', err);
         } finally {
-            setIsLoading(false);
+            cursor ? setIsLoadingMore(false) : setIsLoading(false);
         }
     };
 
@@ -200,6 +206,9 @@ export default function UsersPage() {
                         </svg>
                     </Button>
                 )}
+                hasMore={!!nextCursor}
+                onLoadMore={() => fetchUsers(nextCursor)}
+                isLoadingMore={isLoadingMore}
                 emptyMessage="No users found"
             />
 
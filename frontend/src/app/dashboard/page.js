@@ -12,6 +12,8 @@ import api from '@/lib/api';
 export default function DashboardPage() {
   const [projects, setProjects] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
 
   useEffect(() => {
@@ -21,8 +23,9 @@ export default function DashboardPage() {
   const fetchProjects = async () => {
     try {
       const response = await api.get('/projects/project/');
-      // response structure: { detail: "...", data: [...] }
+      // response structure: { detail: "...", data: [...], next: cursor or null }
       setProjects(response.data || []);
+      setNextCursor(response.next || null);
     } catch (err) {
       console.error('Failed to fetch projects:', err);
       setError('Failed to load projects. Please try again.');
@@ -31,6 +34,20 @@ export default function DashboardPage() {
     }
   };
 
+  const loadMoreProjects = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await api.get('/projects/project/', { cursor: nextCursor });
+      setProjects((current) => [...current, ...(response.data || [])]);
+      setNextCursor(response.next || null);
+    } catch (err) {
+      console.error('Failed to fetch projects:', err);
+      setError('Failed to load more projects. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <AuthGuard>
       <AppLayout>
@@ -64,7 +81,17 @@ export default function DashboardPage() {
               <ProjectCard key={project.id} project={project} />
             ))}
           </div>
-        ) : (
+        ) : null}
+
+        {!loading && nextCursor && (
+          <div className="mt-8 flex justify-center">
+            <Button variant="outline" onClick={loadMoreProjects} disabled={loadingMore}>
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          </div>
+        )}
+
+        {loading || projects.length > 0 ? null : (
           <div className="flex min-h-[400px] flex-col items-center justify-center rounded-lg border border-dashed border-border p-8 text-center">
             <div className="mx-auto flex h-12 w-12 items-center justify-center rounded-full bg-muted">
               <svg className="h-6 w-6 text-muted-foreground" fill="none" viewBox="0 0 24 24" stroke="currentColor">
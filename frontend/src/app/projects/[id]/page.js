@@ -26,27 +26,15 @@ export default function ProjectDetailPage() {
 
   const fetchProject = async (id) => {
     try {
-      const response = await api.get(`/projects/project/${id}/`);
-      setProject(response.data);
-
-      // Check if there are more questions to answer
-      try {
-        const questionResponse = await api.get(`/projects/get_next_question/${id}/`);
-        // If we get a question, there are more to answer
-        if (questionResponse.data) {
-          setProject(prev => ({ ...prev, hasMoreQuestions: true }));
-        } else {
-          setProject(prev => ({ ...prev, hasMoreQuestions: false }));
-        }
-      } catch (err) {
-        // If error message says all questions answered, set hasMoreQuestions to false
-        if (err.message && err.message.includes('All questions have been answered')) {
-          setProject(prev => ({ ...prev, hasMoreQuestions: false }));
-        } else {
-          // Some other error, assume there might be questions
-          setProject(prev => ({ ...prev, hasMoreQuestions: true }));
-        }
-      }
+      // One snapshot with the project, its questions, answers and progress
+      const response = await api.get(`/projects/questionnaire/${id}/`);
+      const { project, progress, complete } = response.data;
+      setProject({
+        ...project,
+        hasMoreQuestions: !complete,
+        answered_count: progress.answered_questions,
+        total_count: progress.total_questions,
+      });
     } catch (err) {
       console.error('Failed to fetch project:', err);
       setError('Failed to load project details.');
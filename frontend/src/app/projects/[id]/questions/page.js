@@ -90,8 +90,11 @@ export default function QuestionPage() {
             });
           }
         } else {
-          // No more questions
-          setQuestion(null);
+          // Either all questions are answered or the AI questions aren't
+          // ready yet (still generating, or waiting on the uploaded file);
+          // the next-question endpoint tells the two apart
+          setAnswer('');
+          fetchNextQuestion(params.id);
         }
       }
     } catch (err) {
@@ -9,6 +9,8 @@ import { Alert, AlertDescription } from '@/components/ui/Alert';
 import ReportViewer from '@/components/ReportViewer';
 import api from '@/lib/api';
 
+const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'https://scopesmith-backend.onrender.com/api';
+
 export default function ReportPage() {
   const params = useParams();
   const [reportHtml, setReportHtml] = useState('');
@@ -21,11 +23,69 @@ export default function ReportPage() {
     }
   }, [params.id]);
 
+  const streamReport = async (projectId) => {
+    // Server-Sent Events over fetch so the auth header can be sent
+    const response = await fetch(`${API_BASE_URL}/projects/generate_report_stream/${projectId}/`, {
+      headers: {
+        Accept: 'text/event-stream',
+        Authorization: `Token ${localStorage.getItem('auth_token')}`,
+      },
+    });
+    if (!response.ok || !response.body) {
+      throw new Error('Report stream unavailable');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let html = '';
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1] || 'message';
+        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+        if (event === 'error') {
+          throw new Error(data.detail || 'Report generation failed');
+        }
+        if (event === 'done') {
+          return data.report;
+        }
+        html += data.delta || '';
+        setReportHtml(html);
+        setLoading(false);
+      }
+    }
+    throw new Error('Report stream ended early');
+  };
+
   const fetchReport = async (projectId) => {
     try {
-      const response = await api.get(`/projects/generate_report/${projectId}/`);
+      setReportHtml(await streamReport(projectId));
+      setLoading(false);
+      return;
+    } catch (err) {
+      console.error('Failed to stream report, falling back to report job:', err);
+      setLoading(true);
+    }
+
+    try {
+      let response = await api.get(`/projects/generate_report/${projectId}/`);
+      // Report is generated in the background: poll the job until it finishes
+      // job response: { detail, data: { id, status, report: { report: "<HTML string>" } } }
+      while (response.data?.status === 'queued' || response.data?.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        response = await api.get(`/projects/report_job/${response.data.id}/`);
+      }
+      if (response.data?.status === 'failed') {
+        throw new Error(response.data.error || 'Report generation failed');
+      }
       // response: { detail, data: { report: "<HTML string>" } }
-      setReportHtml(response.data?.report || '');
+      const report = response.data?.status === 'done' ? response.data.report : response.data;
+      setReportHtml(report?.report || '');
     } catch (err) {
       console.error('Failed to fetch report:', err);
       setError('Failed to generate report. Please ensure all questions are answered.');
@@ -12,6 +12,9 @@ export function DataTable({
     selectedRows = [],
     onSelectionChange,
     pagination,
+    hasMore = false,
+    onLoadMore,
+    isLoadingMore = false,
     emptyMessage = 'No data found',
     actions,
     title,
@@ -152,6 +155,15 @@ export function DataTable({
                 </table>
             </div>
 
+            {/* Cursor-paginated lists load the next page below the current rows */}
+            {hasMore && !isLoading && (
+                <div className="p-4 border-t border-border flex justify-center">
+                    <Button variant="outline" size="sm" onClick={onLoadMore} disabled={isLoadingMore}>
+                        {isLoadingMore ? 'Loading...' : 'Load more'}
+                    </Button>
+                </div>
+            )}
+
             {/* Pagination */}
             {pagination && (
                 <div className="p-4 border-t border-border flex items-center justify-between">
@@ -51,4 +51,17 @@ export const adminApi = {
     updateSettings: (data) => api.put('/admin/settings/', data),
 };
 
+// Follows a cursor-paginated admin list to the end. Only for lists that are
+// needed whole, e.g. the questions of one project type or a filter's options.
+export const fetchAllPages = async (getPage, params = {}) => {
+    const results = [];
+    let cursor = null;
+    do {
+        const response = await getPage(cursor ? { ...params, cursor } : params);
+        results.push(...(response.results || []));
+        cursor = response.next;
+    } while (cursor);
+    return results;
+};
+
 export default adminApi;